@@ -15,6 +15,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from vfriday.settings import load_settings
+from vfriday.storage_schema import us_from_datetime
 
 
 def main() -> None:
@@ -24,7 +25,7 @@ def main() -> None:
         print("No Viktor-Friday DB found.")
         return
 
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    cutoff = us_from_datetime(datetime.now(timezone.utc) - timedelta(days=7))
     conn = sqlite3.connect(str(db_path))
     conn.row_factory = sqlite3.Row
     rows = conn.execute(
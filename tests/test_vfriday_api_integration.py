@@ -120,3 +120,50 @@ def test_budget_guard_blocks_over_cap(monkeypatch):
     )
     res.raise_for_status()
     assert res.json()["status"] == "budget_blocked"
+
+
+def test_solver_spend_is_recorded_when_tutor_fails(monkeypatch):
+    import pytest
+
+    client, app = _make_client(monkeypatch)
+    sid = _create_session(client)
+    import vfriday.pipeline as pipeline_module
+
+    def fake_solver(**_kwargs):
+        return SolverResult(
+            status="ok",
+            model="fake-solver",
+            explanation="",
+            confidence=0.5,
+            symbolic_claims=[],
+            usage={"cost": 0.25},
+            latency_ms=10,
+            raw={},
+        )
+
+    def failing_tutor(**_kwargs):
+        raise RuntimeError("tutor down")
+
+    monkeypatch.setattr(pipeline_module, "solver_solve", fake_solver)
+    monkeypatch.setattr(pipeline_module, "compose_hint", failing_tutor)
+    req = pipeline_module.IngestEventRequest(trigger_type="HELP_REQUEST", problem_text="p")
+    with pytest.raises(RuntimeError):
+        app.state.orchestrator.ingest(sid, req)
+    snapshot = app.state.storage.budget_snapshot(100.0, 10.0, sid)
+    assert snapshot["session_spent_usd"] == 0.25
+
+
+def test_import_has_no_side_effects_and_lifespan_warms(monkeypatch):
+    import subprocess
+    import sys
+
+    code = "import threading, vfriday.app; print(threading.active_count())"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == "1"
+
+    client, app = _make_client(monkeypatch)
+    warmed = []
+    monkeypatch.setattr(app.state.orchestrator, "warm", lambda: warmed.append(True))
+    with client:
+        client.get("/healthz").raise_for_status()
+    assert warmed == [True]
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pytest
+
 from vfriday.skills_engine.apply import apply_skill
 from vfriday.skills_engine.manifest import read_manifest
 from vfriday.skills_engine.state import init_skills_state, load_state
@@ -38,8 +42,9 @@ def test_manifest_parse(tmp_path: Path) -> None:
     )
     m = read_manifest(skill_dir)
     assert m.skill == "add-demo"
-    assert m.structured.env_additions == ["DEMO_KEY"]
-    assert m.structured.python_dependencies == ["demo-pkg>=1.0"]
+    assert m.structured.env_additions == ("DEMO_KEY",)
+    assert m.structured.python_dependencies == ("demo-pkg>=1.0",)
+    assert read_manifest(skill_dir) is m
 
 
 def test_init_skills_state_creates_state_and_base(tmp_path: Path) -> None:
@@ -92,3 +97,223 @@ def test_apply_add_only_skill(tmp_path: Path) -> None:
     state = load_state(project)
     applied = state.get("applied_skills") or []
     assert any(x.get("name") == "add-demo" for x in applied)
+
+
+def test_apply_reports_unreadable_skill_file_as_failure(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    _write(project / "VERSION", "6.2.0\n")
+    init_skills_state(project)
+
+    skill_dir = tmp_path / "skills" / "loop-demo"
+    _write(
+        skill_dir / "manifest.yaml",
+        "\n".join(
+            [
+                'skill: "loop-demo"',
+                'version: "0.1.0"',
+                'core_version: "6.2.0"',
+                "adds: [\"loop.txt\"]",
+                "modifies: []",
+            ]
+        ),
+    )
+    (skill_dir / "add").mkdir()
+    (skill_dir / "add" / "loop.txt").symlink_to(skill_dir / "add" / "loop.txt")
+
+    result = apply_skill(project, skill_dir)
+    assert result.success is False
+    assert "skill_add_file_missing" in result.message
+    assert not (project / "loop.txt").exists()
+
+
+def test_backup_restore_roundtrip(tmp_path: Path) -> None:
+    from vfriday.skills_engine.backup import clear_backup, create_backup, restore_backup
+
+    for idx in range(12):
+        _write(tmp_path / "src" / f"mod_{idx}.py", f"value = {idx}\n")
+    targets = [tmp_path / "src" / f"mod_{idx}.py" for idx in range(12)]
+    targets.append(tmp_path / "src" / "new_file.py")
+    create_backup(tmp_path, targets)
+
+    for idx in range(12):
+        _write(tmp_path / "src" / f"mod_{idx}.py", "clobbered\n")
+    _write(tmp_path / "src" / "new_file.py", "added by skill\n")
+    restore_backup(tmp_path)
+    clear_backup(tmp_path)
+
+    for idx in range(12):
+        assert (tmp_path / "src" / f"mod_{idx}.py").read_text(encoding="utf-8") == f"value = {idx}\n"
+    assert not (tmp_path / "src" / "new_file.py").exists()
+    assert not (tmp_path / ".vfriday" / "backup").exists()
+
+
+def test_backup_restore_keeps_file_modes(tmp_path: Path) -> None:
+    import os
+    import stat
+
+    from vfriday.skills_engine.backup import create_backup, restore_backup
+
+    target = tmp_path / "bin" / "run.sh"
+    _write(target, "echo hi\n")
+    os.chmod(target, 0o775)
+    create_backup(tmp_path, [target])
+    target.unlink()
+    restore_backup(tmp_path)
+    assert stat.S_IMODE(target.stat().st_mode) == 0o775
+    assert target.read_text(encoding="utf-8") == "echo hi\n"
+
+
+def test_restore_backup_reads_legacy_tree_and_rejects_escapes(tmp_path: Path) -> None:
+    import json
+
+    from vfriday.skills_engine.backup import MANIFEST_FILE, restore_backup
+    from vfriday.skills_engine.state import backup_dir
+
+    root = tmp_path / "project"
+    bdir = backup_dir(root)
+    _write(bdir / "src" / "kept.py", "original\n")
+    manifest = [{"rel": "src/kept.py", "exists": True}, {"rel": "src/added.py", "exists": False}]
+    (bdir / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+    _write(root / "src" / "kept.py", "clobbered\n")
+    _write(root / "src" / "added.py", "added by skill\n")
+    restore_backup(root)
+    assert (root / "src" / "kept.py").read_text(encoding="utf-8") == "original\n"
+    assert not (root / "src" / "added.py").exists()
+
+    _write(tmp_path / "outside.txt", "keep\n")
+    (bdir / MANIFEST_FILE).write_text(json.dumps([{"rel": "../outside.txt", "exists": False}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="unsafe_backup_path"):
+        restore_backup(root)
+    assert (tmp_path / "outside.txt").exists()
+
+
+def test_compute_file_hash_tracks_content_changes(tmp_path: Path) -> None:
+    import hashlib
+    import os
+
+    from vfriday.skills_engine.state import compute_file_hash
+
+    target = tmp_path / "a.txt"
+    _write(target, "one\n")
+    assert compute_file_hash(target) == hashlib.sha256(b"one\n").hexdigest()
+    _write(target, "two!\n")
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert compute_file_hash(target) == hashlib.sha256(b"two!\n").hexdigest()
+
+
+def test_apply_modify_skill_reports_conflicts_in_manifest_order(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    _write(project / "VERSION", "6.2.0\n")
+    for name in ("a", "b", "c", "d"):
+        _write(project / "src" / f"{name}.py", "one\ntwo\nthree\n")
+    init_skills_state(project)
+    _write(project / "src" / "b.py", "one\nLOCAL\nthree\n")
+    _write(project / "src" / "d.py", "one\nLOCAL\nthree\n")
+
+    skill_dir = tmp_path / "skills" / "modify-demo"
+    _write(
+        skill_dir / "manifest.yaml",
+        "\n".join(
+            [
+                'skill: "modify-demo"',
+                'version: "0.1.0"',
+                'core_version: "6.2.0"',
+                "adds: []",
+                'modifies: ["src/d.py", "src/a.py", "src/c.py", "src/b.py"]',
+            ]
+        ),
+    )
+    for name in ("a", "b", "c", "d"):
+        _write(skill_dir / "modify" / "src" / f"{name}.py", "one\nSKILL\nthree\n")
+
+    result = apply_skill(project, skill_dir)
+    assert result.success is False
+    assert result.conflict_files == ["src/d.py", "src/b.py"]
+    assert (project / "src" / "a.py").read_text(encoding="utf-8") == "one\ntwo\nthree\n"
+    assert (project / "src" / "b.py").read_text(encoding="utf-8") == "one\nLOCAL\nthree\n"
+
+    # A second apply reuses the shared merge pool instead of starting a new one.
+    merge_threads = {t.ident for t in threading.enumerate() if t.name.startswith("vfriday-merge")}
+    assert merge_threads
+    assert apply_skill(project, skill_dir).conflict_files == ["src/d.py", "src/b.py"]
+    after = {t.ident for t in threading.enumerate() if t.name.startswith("vfriday-merge")}
+    assert merge_threads <= after and len(after) <= 8
+
+
+def test_record_skill_application_skips_identical_rewrite(tmp_path: Path) -> None:
+    import os
+
+    from vfriday.skills_engine.state import (
+        compute_file_hash,
+        hash_cache_path,
+        record_skill_application,
+        state_path,
+    )
+
+    init_skills_state(tmp_path)
+    _write(tmp_path / "a.txt", "a\n")
+    kwargs = {"skill_name": "demo", "version": "0.1.0", "file_hashes": {"a.txt": compute_file_hash(tmp_path / "a.txt")}}
+    record_skill_application(tmp_path, **kwargs)
+    for path in (state_path(tmp_path), hash_cache_path(tmp_path)):
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert compute_file_hash(tmp_path / "a.txt") == kwargs["file_hashes"]["a.txt"]
+    state = record_skill_application(tmp_path, **kwargs)
+    assert state_path(tmp_path).stat().st_mtime_ns == 1_000_000_000
+    assert hash_cache_path(tmp_path).stat().st_mtime_ns == 1_000_000_000
+    assert [x["name"] for x in state["applied_skills"]] == ["demo"]
+
+    record_skill_application(tmp_path, **{**kwargs, "version": "0.2.0"})
+    assert load_state(tmp_path)["applied_skills"][-1]["version"] == "0.2.0"
+
+
+def test_structured_ops_leave_unchanged_files_alone(tmp_path: Path) -> None:
+    import os
+
+    from vfriday.skills_engine.structured import merge_env_additions, merge_python_dependencies
+
+    env = tmp_path / ".env.example"
+    _write(env, "A=1\r\n")
+    os.utime(env, ns=(1_000_000_000, 1_000_000_000))
+    assert merge_env_additions(env, ["A"]) == []
+    assert env.stat().st_mtime_ns == 1_000_000_000
+    assert merge_env_additions(env, ["B"]) == ["B"]
+    assert env.read_text(encoding="utf-8") == "A=1\nB=\n"
+
+    req = tmp_path / "requirements.txt"
+    assert merge_python_dependencies(req, []) == []
+    assert req.read_text(encoding="utf-8") == "\n"
+
+
+def test_in_process_merge_keeps_bytes_and_prunes_scratch_blobs(tmp_path: Path) -> None:
+    pytest.importorskip("pygit2")
+    from vfriday.skills_engine import merge
+
+    base, current, theirs = tmp_path / "base", tmp_path / "current", tmp_path / "theirs"
+    base.write_bytes(b"a\r\nb\r\nc\r\n")
+    current.write_bytes("é\r\nb\r\nc\r\n".encode("utf-8"))
+    theirs.write_bytes(b"a\r\nb\r\nz\r\n")
+    result = merge._merge_in_process(current, base, theirs)
+    assert result is not None and result.clean
+    assert current.read_bytes() == "é\r\nb\r\nz\r\n".encode("utf-8")
+
+    theirs.write_bytes(b"y\r\nb\r\nz\r\n")
+    conflicted = merge._merge_in_process(current, base, theirs)
+    assert conflicted is not None and conflicted.conflicted
+    assert b"<<<<<<<" in current.read_bytes()
+
+    with merge._SCRATCH_LOCK:
+        scratch = merge._scratch_repo()
+    objects = Path(scratch.path) / "objects"
+    assert not [p for p in objects.glob("??/*") if p.is_file()]
+
+    def merge_copy(idx: int) -> bool:
+        copy = tmp_path / f"current{idx}"
+        copy.write_bytes(base.read_bytes())
+        return merge._merge_in_process(copy, base, theirs) is not None
+
+    # Merges from fresh threads share the one scratch repo.
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(merge_copy, range(8)))
+    with merge._SCRATCH_LOCK:
+        assert merge._scratch_repo() is scratch
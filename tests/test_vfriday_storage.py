@@ -0,0 +1,614 @@
+"""Tests for Viktor-Friday SQLite/JSONL storage."""
+
+from __future__ import annotations
+
+import base64
+import gc
+import json
+import math
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+import vfriday.storage as storage_mod
+import vfriday.storage_audit as audit_mod
+from vfriday.storage import Storage
+
+
+def _make_storage(tmp_path: Path, **kwargs) -> Storage:
+    return Storage(tmp_path / "vfriday.sqlite3", tmp_path / "audit.jsonl", **kwargs)
+
+
+def test_async_writes_are_visible_after_flush(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True)
+    try:
+        for idx in range(20):
+            storage.save_event(f"t{idx}", "s1", "ingest_received", {"idx": idx})
+        storage.flush()
+        events = storage.get_recent_events("s1", limit=50)
+        assert [e["payload"]["idx"] for e in events] == list(reversed(range(20)))
+        audit = (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["payload"]["idx"] for line in audit] == list(range(20))
+    finally:
+        storage.close()
+
+
+def test_reads_see_queued_writes_without_explicit_flush(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True)
+    try:
+        storage.save_stress_snapshot("s1", stress_ai=0.25, stress_viktor=0.5, factors={})
+        assert storage.get_latest_stress("s1") == {"stress_ai": 0.25, "stress_viktor": 0.5}
+    finally:
+        storage.close()
+
+
+def test_transaction_rolls_back_writes_and_audit(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    try:
+        with storage.transaction():
+            storage.save_event("t1", "s1", "ingest_received", {})
+            storage.save_setpoint_snapshot("s1", {"setpoints": {"competency": 0.9}})
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert storage.get_recent_events("s1") == []
+    assert storage.get_latest_setpoints("s1", fallback={"competency": 0.5}) == {"competency": 0.5}
+    assert not (tmp_path / "audit.jsonl").exists()
+
+    with storage.transaction():
+        storage.save_event("t2", "s1", "pipeline_completed", {"ok": True})
+    assert [e["event_type"] for e in storage.get_recent_events("s1")] == ["pipeline_completed"]
+    assert (tmp_path / "audit.jsonl").read_text(encoding="utf-8").count("\n") == 1
+
+
+def test_budget_snapshot_tracks_entries_after_seeding(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    storage.add_budget_entry("t0", "s1", "solver", 1.5, "m", {})
+    first = storage.budget_snapshot(10.0, 4.0, "s1")
+    assert first["monthly_spent_usd"] == 1.5
+    assert first["session_spent_usd"] == 1.5
+
+    storage.add_budget_entry("t1", "s1", "tutor", 2.0, "m", {})
+    storage.add_budget_entry("t2", "s2", "tutor", 0.5, "m", {})
+    second = storage.budget_snapshot(10.0, 4.0, "s1")
+    assert second["monthly_spent_usd"] == 4.0
+    assert second["session_spent_usd"] == 3.5
+    assert second["monthly_remaining_usd"] == 6.0
+    assert storage.budget_snapshot(10.0, 4.0, "s2")["session_spent_usd"] == 0.5
+
+
+def test_budget_totals_count_each_committed_entry_once(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    storage.add_budget_entry("t0", "s1", "solver", 1.0, "m", {})
+    assert storage.budget_snapshot(10.0, 4.0, "s1")["monthly_spent_usd"] == 1.0
+
+    with storage.transaction():
+        storage.add_budget_entry("t1", "s1", "tutor", 2.0, "m", {})
+        # Seeding a new session mid-transaction must not pick up the uncommitted row.
+        assert storage.budget_snapshot(10.0, 4.0, "s2")["monthly_spent_usd"] == 1.0
+    snap = storage.budget_snapshot(10.0, 4.0, "s1")
+    assert snap["monthly_spent_usd"] == 3.0
+    assert snap["session_spent_usd"] == 3.0
+
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.add_budget_entry("t2", "s1", "tutor", 5.0, "m", {})
+            raise RuntimeError("boom")
+    assert storage.budget_snapshot(10.0, 4.0, "s1")["monthly_spent_usd"] == 3.0
+    assert storage.monthly_spent() == 3.0
+    # A fresh instance seeds its totals from SQL, so the cached ones must agree.
+    reseeded = _make_storage(tmp_path)
+    try:
+        assert reseeded.budget_snapshot(10.0, 4.0, "s1") == storage.budget_snapshot(10.0, 4.0, "s1")
+    finally:
+        reseeded.close()
+        storage.close()
+
+
+def test_legacy_nan_payload_is_still_readable(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    # The stdlib encoder that wrote older rows emits bare NaN/Infinity tokens.
+    with sqlite3.connect(storage.db_path) as conn:
+        conn.execute(
+            "INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at) VALUES (?, ?, ?, ?, ?)",
+            ("t0", "s1", "ingest_received", '{"score": NaN, "cap": Infinity}', 1_704_067_200_000_000),
+        )
+    (event,) = storage.get_recent_events("s1")
+    assert math.isnan(event["payload"]["score"])
+    assert event["payload"]["cap"] == math.inf
+
+
+def test_non_finite_payload_values_round_trip(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    storage.save_event("t0", "s1", "note", {"v": float("nan"), "hi": math.inf, "lo": [-math.inf], "none": None})
+    (event,) = storage.get_recent_events("s1")
+    assert math.isnan(event["payload"]["v"])
+    assert event["payload"]["hi"] == math.inf and event["payload"]["lo"] == [-math.inf]
+    assert event["payload"]["none"] is None
+
+
+def test_field_projection_reads_legacy_nan_rows(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    with sqlite3.connect(storage.db_path) as conn:
+        conn.execute(
+            "INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at) VALUES (?, ?, ?, ?, ?)",
+            ("t0", "s1", "pipeline_completed", '{"solver_error_type": "sign", "stress": NaN}', 1_704_067_200_000_000),
+        )
+    storage.save_event("t1", "s1", "pipeline_completed", {"solver_error_type": "units", "flags": ["a"]})
+    events = storage.get_recent_events("s1", fields=("solver_error_type", "flags"))
+    assert [e["payload"] for e in events] == [
+        {"solver_error_type": "units", "flags": ["a"]},
+        {"solver_error_type": "sign"},
+    ]
+
+
+def test_database_is_in_wal_mode(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    storage.close()
+    conn = sqlite3.connect(str(tmp_path / "vfriday.sqlite3"))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_connections_are_reused_per_thread_and_closed(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    storage.create_session(student_alias="a", topic=None, grade_level=None, goal=None, active_setpoints={})
+    with storage.transaction() as conn:
+        pass
+    with storage.transaction() as again:
+        assert again is conn
+    seen = []
+
+    def _worker() -> None:
+        with storage.transaction() as worker_conn:
+            seen.append(worker_conn)
+
+    worker = threading.Thread(target=_worker)
+    worker.start()
+    worker.join()
+    assert seen[0] is not conn
+    storage.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_run_retention_strips_raw_fields_across_pages(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(storage_mod, "_RETENTION_PAGE_ROWS", 2)
+    storage = _make_storage(tmp_path)
+    try:
+        with storage.transaction() as conn:
+            for idx in range(5):
+                payload = {"idx": idx, "ocr_text": "raw"} if idx != 2 else {"idx": idx}
+                if idx == 3:
+                    payload = {"idx": idx, "image_base64": None}
+                conn.execute(
+                    "INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (f"t{idx}", "s1", "ingest_received", json.dumps(payload), 946_684_800_000_000),
+                )
+        storage.save_event("t-new", "s1", "ingest_received", {"idx": 5, "ocr_text": "keep"})
+        result = storage.run_retention(retention_days=30)
+        assert result["sanitized_rows"] == 4
+        payloads = {e["payload"]["idx"]: e["payload"] for e in storage.get_recent_events("s1", limit=10)}
+        assert all("ocr_text" not in payloads[idx] for idx in range(5))
+        assert payloads[3] == {"idx": 3}
+        assert payloads[5]["ocr_text"] == "keep"
+    finally:
+        storage.close()
+
+
+def test_run_retention_strips_legacy_nan_rows(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    with sqlite3.connect(storage.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("t0", "s1", "ingest_received", '{"idx": 0, "ocr_text": "raw", "score": NaN}', 946_684_800_000_000),
+                ("t1", "s1", "ingest_received", '{"idx": 1, "score": Infinity}', 946_684_800_000_000),
+                ("t2", "s1", "ingest_received", '{"idx": 2, "ocr_text": "raw"}', 946_684_800_000_000),
+            ],
+        )
+    assert storage.run_retention(retention_days=30)["sanitized_rows"] == 2
+    payloads = {e["payload"]["idx"]: e["payload"] for e in storage.get_recent_events("s1")}
+    assert "ocr_text" not in payloads[0] and "ocr_text" not in payloads[2]
+    assert payloads[1] == {"idx": 1, "score": math.inf}
+    assert storage.run_retention(retention_days=30)["sanitized_rows"] == 0
+
+
+def test_chat_sessions_migrates_to_without_rowid(tmp_path: Path) -> None:
+    db = tmp_path / "vfriday.sqlite3"
+    conn = sqlite3.connect(str(db))
+    conn.execute(
+        "CREATE TABLE chat_sessions (chat_id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, updated_at TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO chat_sessions VALUES (42, 's-old', '2024-01-01T00:00:00+00:00')")
+    conn.commit()
+    conn.close()
+
+    storage = _make_storage(tmp_path)
+    try:
+        assert storage.get_chat_session(42) == "s-old"
+        storage.bind_chat_session(42, "s-new")
+        assert storage.get_chat_session(42) == "s-new"
+    finally:
+        storage.close()
+    conn = sqlite3.connect(str(db))
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'chat_sessions'").fetchone()[0]
+    conn.close()
+    assert "WITHOUT ROWID" in sql
+
+
+def test_queued_budget_entries_and_grouped_batches(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True, writer_lanes=1)
+    try:
+        # One lane, queued back to back: the writer folds these into a single executemany.
+        for idx in range(3):
+            storage.save_stress_snapshot("s1", stress_ai=0.1 * idx, stress_viktor=0.0, factors={})
+        storage.flush("s1")
+        assert storage.get_latest_stress("s1")["stress_ai"] == 0.2
+
+        for _ in range(4):
+            storage.add_budget_entry("t", "s1", "solver", 0.25, "m", {})
+        snap = storage.budget_snapshot(10.0, 1.0, "s1")
+        assert snap["session_spent_usd"] == 1.0
+        assert snap["monthly_spent_usd"] == 1.0
+        assert storage.monthly_spent() == 1.0
+    finally:
+        storage.close()
+
+
+def test_legacy_iso_timestamps_are_migrated_to_epoch_microseconds(tmp_path: Path) -> None:
+    db = tmp_path / "vfriday.sqlite3"
+    conn = sqlite3.connect(str(db))
+    conn.executescript(
+        """
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, trace_id TEXT NOT NULL, session_id TEXT NOT NULL,
+            event_type TEXT NOT NULL, payload_json TEXT NOT NULL, created_at TEXT NOT NULL
+        );
+        CREATE TABLE budget_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, trace_id TEXT NOT NULL, session_id TEXT,
+            category TEXT NOT NULL, model TEXT, amount_usd REAL NOT NULL,
+            metadata_json TEXT NOT NULL, created_at TEXT NOT NULL
+        );
+        """
+    )
+    old_event_ts = "2024-03-05T06:07:08.123456+00:00"
+    conn.execute(
+        "INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("t0", "s1", "ingest_received", "{}", old_event_ts),
+    )
+    this_month = datetime.now(timezone.utc).replace(day=1, hour=1).isoformat()
+    conn.execute(
+        "INSERT INTO budget_ledger (trace_id, session_id, category, model, amount_usd, metadata_json, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("t0", "s1", "solver", "m", 2.5, "{}", this_month),
+    )
+    conn.commit()
+    conn.close()
+
+    storage = _make_storage(tmp_path)
+    try:
+        storage.save_event("t1", "s1", "pipeline_completed", {})
+        events = storage.get_recent_events("s1")
+        assert [e["event_type"] for e in events] == ["pipeline_completed", "ingest_received"]
+        assert events[1]["created_at"] == old_event_ts
+        assert storage.monthly_spent() == 2.5
+        with storage.transaction() as c:
+            assert c.execute("SELECT typeof(created_at) FROM events").fetchall()[0][0] == "integer"
+            assert c.execute("SELECT created_at_iso FROM events_iso WHERE trace_id = 't0'").fetchone()[0].startswith(
+                "2024-03-05T06:07:08.123"
+            )
+    finally:
+        storage.close()
+
+
+def test_bulk_run_saves_insert_every_row(tmp_path: Path) -> None:
+    runs = [
+        {
+            "trace_id": f"t{idx}",
+            "session_id": f"s{idx % 2}",
+            "model": "m",
+            "status": "ok",
+            "latency_ms": idx,
+            "usage": {},
+            "response": {"idx": idx},
+        }
+        for idx in range(5)
+    ]
+    for async_writes in (False, True):
+        storage = _make_storage(tmp_path / str(async_writes), async_writes=async_writes)
+        try:
+            storage.save_solver_runs(runs)
+            storage.save_solver_runs([])
+            storage.flush()
+            with storage.transaction() as conn:
+                rows = conn.execute("SELECT trace_id, session_id FROM solver_runs ORDER BY latency_ms").fetchall()
+            assert [tuple(row) for row in rows] == [(f"t{idx}", f"s{idx % 2}") for idx in range(5)]
+        finally:
+            storage.close()
+
+
+def test_append_audit_splices_pre_encoded_payload(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+    try:
+        storage.append_audit(trace_id="t'1", session_id="s1", event_type="note", payload_json='{"b":1,"a":"é"}')
+        storage.append_audit(trace_id="t2", session_id="s1", event_type="note", payload={"z": [1]})
+    finally:
+        storage.close()
+    lines = (tmp_path / "audit.jsonl").read_bytes().splitlines()
+    assert lines[0].endswith(b',"payload":{"b":1,"a":"\xc3\xa9"}}')
+    records = [json.loads(line) for line in lines]
+    assert records[0]["trace_id"] == "t'1" and records[0]["payload"] == {"b": 1, "a": "é"}
+    assert records[1]["payload"] == {"z": [1]}
+
+
+def test_event_images_are_stored_as_blobs_and_restored_on_demand(tmp_path: Path) -> None:
+    image = base64.b64encode(b"\x89PNG" + b"\x00" * 4096).decode("ascii")
+    storage = _make_storage(tmp_path)
+    try:
+        storage.save_event("t1", "s1", "ingest_received", {"image_base64": image, "n": 1})
+        storage.save_event("t2", "s1", "ingest_received", {"image_base64": "not base64!", "n": 2})
+        with storage.transaction() as c:
+            payload_json, blob, codec = c.execute(
+                "SELECT payload_json, payload_blob, payload_blob_codec FROM events WHERE trace_id = 't1'"
+            ).fetchone()
+        assert "image_base64" not in json.loads(payload_json)
+        assert codec in ("zstd", "zlib") and len(blob) < 4100
+
+        light = storage.get_recent_events("s1")
+        assert light[1]["payload"] == {"n": 1}
+        assert light[0]["payload"]["image_base64"] == "not base64!"
+        full = storage.get_recent_events("s1", include_images=True)
+        assert full[1]["payload"] == {"image_base64": image, "n": 1}
+
+        with storage.transaction() as conn:
+            conn.execute("UPDATE events SET created_at = 0")
+        assert storage.run_retention(retention_days=30)["sanitized_rows"] == 2
+        with storage.transaction() as c:
+            assert c.execute("SELECT COUNT(*) FROM events WHERE payload_blob IS NOT NULL").fetchone()[0] == 0
+    finally:
+        storage.close()
+
+
+def test_recent_events_field_projection_matches_full_payload(tmp_path: Path) -> None:
+    payload = {"err": "parse", "n": 2, "x": 1.5, "ok": True, "none": None, "nested": {"a": [1, 2]}, "a.b": "dot"}
+    storage = _make_storage(tmp_path)
+    try:
+        storage.save_event("t1", "s1", "pipeline_completed", payload)
+        storage.save_event("t2", "s1", "pipeline_completed", {"n": 3})
+        fields = ["err", "n", "x", "ok", "none", "nested", "a.b", "missing"]
+        projected = storage.get_recent_events("s1", fields=fields)
+        full = storage.get_recent_events("s1")
+        assert projected[0]["payload"] == {"n": 3}
+        assert projected[1]["payload"] == payload
+        assert [p["created_at"] for p in projected] == [f["created_at"] for f in full]
+        assert projected[1]["payload"]["ok"] is True
+    finally:
+        storage.close()
+
+
+def test_audit_syncs_are_coalesced_off_the_write_path(tmp_path: Path, monkeypatch) -> None:
+    synced = []
+    synced_event = threading.Event()
+
+    def _fake_datasync(fd: int) -> None:
+        synced.append(fd)
+        synced_event.set()
+
+    monkeypatch.setattr(audit_mod, "_datasync", _fake_datasync)
+    monkeypatch.setattr(audit_mod, "SYNC_SECONDS", 3600.0)
+    storage = _make_storage(tmp_path)
+    try:
+        for idx in range(31):
+            storage.append_audit(trace_id=f"t{idx}", session_id="s1", event_type="note", payload={})
+        assert synced == []
+        storage.append_audit(trace_id="t31", session_id="s1", event_type="note", payload={})
+        assert synced_event.wait(5)
+        assert len(synced) == 1
+        storage.flush_audit()
+        assert len(synced) == 1
+        storage.append_audit(trace_id="t32", session_id="s1", event_type="note", payload={})
+    finally:
+        storage.close()
+    # close() syncs the trailing record that never reached the batch size.
+    assert len(synced) == 2
+    assert len((tmp_path / "audit.jsonl").read_bytes().splitlines()) == 33
+
+
+def test_idle_audit_records_are_synced_by_timer(tmp_path: Path, monkeypatch) -> None:
+    synced_event = threading.Event()
+    monkeypatch.setattr(audit_mod, "_datasync", lambda fd: synced_event.set())
+    monkeypatch.setattr(audit_mod, "SYNC_SECONDS", 0.05)
+    storage = _make_storage(tmp_path)
+    try:
+        storage.append_audit(trace_id="t0", session_id="s1", event_type="note", payload={})
+        assert synced_event.wait(5)
+    finally:
+        storage.close()
+
+
+def test_concurrent_writers_rely_on_sqlite_locking(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path)
+
+    def _write(worker: int) -> None:
+        for idx in range(25):
+            with storage.transaction():
+                storage.save_event(f"t{worker}-{idx}", f"s{worker}", "note", {"idx": idx})
+            storage.update_session_setpoints(f"s{worker}", {"k": float(idx)})
+
+    try:
+        threads = [threading.Thread(target=_write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with storage.transaction() as c:
+            assert c.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 100
+    finally:
+        storage.close()
+
+
+def test_begin_immediate_backs_off_while_database_is_locked(tmp_path: Path, monkeypatch) -> None:
+    pragmas = tuple(p for p in storage_mod._CONNECTION_PRAGMAS if "busy_timeout" not in p)
+    monkeypatch.setattr(storage_mod, "_CONNECTION_PRAGMAS", (*pragmas, "PRAGMA busy_timeout=0"))
+    storage = _make_storage(tmp_path)
+    blocker = sqlite3.connect(str(tmp_path / "vfriday.sqlite3"), check_same_thread=False)
+    try:
+        blocker.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.1, blocker.commit)
+        release.start()
+        storage.save_event("t1", "s1", "note", {})
+        release.join()
+        assert [e["event_type"] for e in storage.get_recent_events("s1")] == ["note"]
+    finally:
+        blocker.close()
+        storage.close()
+
+
+def test_failed_background_write_is_raised_by_flush(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True, writer_lanes=1)
+    try:
+        storage.save_event("t1", "s1", "note", {"idx": 1})
+        storage.save_event("t2", None, "note", {"idx": 2})  # violates events.session_id NOT NULL
+        storage.save_event("t3", "s1", "note", {"idx": 3})
+        with pytest.raises(sqlite3.IntegrityError):
+            storage.flush()
+        storage.flush()
+        assert [e["payload"]["idx"] for e in storage.get_recent_events("s1")] == [3, 1]
+        audit = (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["trace_id"] for line in audit] == ["t1", "t3"]
+    finally:
+        storage.close()
+
+
+def test_closed_storage_can_be_collected(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True)
+    storage.save_event("t1", "s1", "note", {"idx": 1})
+    storage.close()
+    ref = weakref.ref(storage)
+    del storage
+    gc.collect()
+    assert ref() is None
+
+
+def test_unclosed_storage_drains_queue_at_exit(tmp_path: Path) -> None:
+    db, audit = str(tmp_path / "vfriday.sqlite3"), str(tmp_path / "audit.jsonl")
+    code = (
+        "from vfriday.storage import Storage\n"
+        f"storage = Storage({db!r}, {audit!r}, async_writes=True)\n"
+        "storage.save_event('t1', 's1', 'note', {'idx': 1})\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert proc.returncode == 0 and proc.stderr == ""
+    assert [e["payload"] for e in _make_storage(tmp_path).get_recent_events("s1")] == [{"idx": 1}]
+
+
+def test_async_writes_inside_transaction_roll_back(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True)
+    try:
+        storage.save_event("t0", "s1", "note", {"idx": 0})
+        # transaction() does not wait for queued writes; flush so t0 is visible inside it.
+        storage.flush("s1")
+        with pytest.raises(RuntimeError):
+            with storage.transaction():
+                storage.save_event("t1", "s1", "note", {"idx": 1})
+                storage.add_budget_entry("t1", "s1", "solver", 1.0, "m", {})
+                assert [e["payload"]["idx"] for e in storage.get_recent_events("s1")] == [1, 0]
+                raise RuntimeError("boom")
+        storage.flush()
+        assert [e["payload"]["idx"] for e in storage.get_recent_events("s1")] == [0]
+        audit = (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["trace_id"] for line in audit] == ["t0"]
+    finally:
+        storage.close()
+
+
+def test_write_group_is_queued_without_waiting_on_sqlite(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True)
+    try:
+        session_id = storage.create_session(
+            student_alias="v", topic=None, grade_level=None, goal=None, active_setpoints={"a": 0.1}
+        )["session_id"]
+        blocker = sqlite3.connect(storage.db_path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.monotonic()
+            with storage.write_group(session_id):
+                storage.update_session_setpoints(session_id, {"a": 0.9})
+                storage.save_event("t1", session_id, "pipeline_completed", {"ok": True})
+            # The group only lands on the lane; the caller never waits for the held write lock.
+            assert time.monotonic() - started < 1.0
+        finally:
+            blocker.rollback()
+            blocker.close()
+        assert storage.get_session(session_id)["active_setpoints"] == {"a": 0.9}
+        assert [e["event_type"] for e in storage.get_recent_events(session_id)] == ["pipeline_completed"]
+    finally:
+        storage.close()
+
+
+def test_write_group_commits_or_drops_as_one_unit(tmp_path: Path) -> None:
+    storage = _make_storage(tmp_path, async_writes=True, writer_lanes=1)
+    try:
+        with pytest.raises(RuntimeError):
+            with storage.write_group("s1"):
+                storage.save_event("t0", "s1", "note", {"idx": 0})
+                raise RuntimeError("boom")
+        with storage.write_group("s1"):
+            storage.save_event("t1", "s1", "note", {"idx": 1})
+            storage.save_event("t2", None, "note", {"idx": 2})  # violates events.session_id NOT NULL
+        storage.save_event("t3", "s1", "note", {"idx": 3})
+        with pytest.raises(sqlite3.IntegrityError):
+            storage.flush()
+        assert [e["payload"]["idx"] for e in storage.get_recent_events("s1")] == [3]
+    finally:
+        storage.close()
+
+
+def test_queued_write_groups_share_one_commit(tmp_path: Path, monkeypatch) -> None:
+    commits = []
+    real_commit = storage_mod._Connection.commit
+    monkeypatch.setattr(storage_mod._Connection, "commit", lambda conn: commits.append(1) or real_commit(conn))
+    storage = _make_storage(tmp_path, async_writes=True, writer_lanes=1)
+    commits.clear()  # schema setup
+    try:
+        blocker = sqlite3.connect(storage.db_path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        for turn in range(5):
+            with storage.write_group("s1"):
+                for idx in range(3):
+                    storage.save_event(f"t{turn}", "s1", "note", {"idx": turn * 3 + idx})
+        blocker.rollback()
+        blocker.close()
+        storage.flush()
+        # The writer took the first group before the lock was released; the other four commit together.
+        assert len(commits) <= 2
+        assert [e["payload"]["idx"] for e in storage.get_recent_events("s1", limit=50)] == list(range(14, -1, -1))
+    finally:
+        storage.close()
+
+
+def test_audit_record_keeps_image_split_off_into_blob(tmp_path: Path) -> None:
+    image = base64.b64encode(b"\x00" * 512).decode("ascii")
+    payload = {"image_base64": image, "user_message": "привет", "n": 1}
+    storage = _make_storage(tmp_path)
+    try:
+        storage.save_event("t1", "s1", "ingest_received", payload)
+        storage.save_event("t2", "s1", "ingest_received", {"n": 2})
+    finally:
+        storage.close()
+    records = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [{k: v for k, v in r.items() if k != "ts"} for r in records] == [
+        {"trace_id": "t1", "session_id": "s1", "event_type": "ingest_received", "payload": payload},
+        {"trace_id": "t2", "session_id": "s1", "event_type": "ingest_received", "payload": {"n": 2}},
+    ]
@@ -55,3 +55,11 @@ def test_setpoint_drift_clamp():
     assert new_values["competency"] <= 0.55
     assert new_values["transfer"] >= 0.45
 
+
+def test_compiled_weights_match_mapping_weights():
+    from vfriday.governance.stress import compile_weights, weighted_stress
+
+    factors = {"a": 0.2, "b": 1.5, "c": 0.9}
+    weights = {"a": 0.5, "b": 0.25, "c": -1.0, "d": 0.25}
+    assert weighted_stress(factors, compile_weights(weights)) == weighted_stress(factors, weights)
+    assert weighted_stress(factors, compile_weights({})) == 0.0
@@ -20,3 +20,79 @@ def test_verify_solver_claims_mixed():
     assert result.failed_claims == 1
     assert 0.0 <= result.disagreement_rate <= 1.0
 
+
+def test_verifier_pool_matches_inline_verification():
+    from vfriday.verifier import pool
+
+    claims = [
+        SolverClaim(claim_type="equality", lhs="2+2", rhs="4"),
+        SolverClaim(claim_type="equality", lhs="2+2", rhs="5"),
+    ]
+    pooled = pool.submit(claims).result()
+    inline = verify_solver_claims(claims)
+    assert pooled.model_dump() == inline.model_dump()
+    assert pool.submit([]).result().status == "no_claims"
+
+
+def test_verify_claim_reuses_cached_work_across_whitespace_variants():
+    from vfriday.verifier import sympy_engine
+
+    sympy_engine._cached_simplify_zero.cache_clear()
+    first = sympy_engine.verify_claim(SolverClaim(claim_type="derivative", expr="x**3", var="x", equals="3*x**2"))
+    again = sympy_engine.verify_claim(SolverClaim(claim_type="derivative", expr="  x**3 ", var="x", equals="3*x**2"))
+    assert first["ok"] is again["ok"] is True
+    assert again["canonical"] == "d/dx(  x**3 ) = 3*x**2"
+    info = sympy_engine._cached_simplify_zero.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_numeric_sampling_rejects_unequal_claims_without_simplify(monkeypatch):
+    from vfriday.verifier import sympy_engine
+
+    def _no_simplify(expr):
+        raise AssertionError("simplify should not run for numerically distinct sides")
+
+    sympy_engine._cached_simplify_zero.cache_clear()
+    monkeypatch.setattr(sympy_engine, "simplify", _no_simplify)
+    assert sympy_engine.verify_claim(SolverClaim(claim_type="equality", lhs="exp(2*x)", rhs="exp(x)**3"))["ok"] is False
+    assert sympy_engine.verify_claim(SolverClaim(claim_type="integral", expr="x", var="x", equals="x**2"))["ok"] is False
+    sympy_engine._cached_simplify_zero.cache_clear()
+
+
+def test_numeric_sampling_keeps_true_identities():
+    from vfriday.verifier import sympy_engine
+
+    sympy_engine._cached_simplify_zero.cache_clear()
+    claims = [
+        SolverClaim(claim_type="equality", lhs="exp(2*x)", rhs="exp(x)**2"),
+        SolverClaim(claim_type="equality", lhs="log(x**2)", rhs="2*log(x)"),
+        SolverClaim(claim_type="equality", lhs="sqrt(x)*sqrt(x)", rhs="x"),
+        SolverClaim(claim_type="derivative", expr="x**5*y", var="x", equals="5*x**4*y"),
+    ]
+    results = [sympy_engine.verify_claim(c)["ok"] for c in claims]
+    assert results == [True, False, True, True]
+
+
+def test_verifier_pool_fans_out_longer_claim_lists():
+    from vfriday.verifier import pool
+
+    claims = [
+        SolverClaim(claim_type="equality", lhs="x**2 - y**2", rhs="(x-y)*(x+y)"),
+        SolverClaim(claim_type="derivative", expr="sin(x)", var="x", equals="cos(x)"),
+        SolverClaim(claim_type="integral", expr="x", var="x", equals="x**2/2"),
+        SolverClaim(claim_type="equality", lhs="2+2", rhs="5"),
+    ]
+    pending = pool.submit(claims)
+    assert len(pending._claim_futures) == len(claims)
+    assert pending.result().model_dump() == verify_solver_claims(claims).model_dump()
+
+
+def test_numeric_sampling_survives_float_cancellation():
+    from vfriday.verifier import sympy_engine
+
+    sympy_engine._cached_simplify_zero.cache_clear()
+    claims = [
+        SolverClaim(claim_type="equality", lhs="exp(8*x)*(1+exp(-8*x)) - exp(8*x)", rhs="1"),
+        SolverClaim(claim_type="equality", lhs="x**20*(1+x**-20) - x**20", rhs="1"),
+    ]
+    assert [sympy_engine.verify_claim(c)["ok"] for c in claims] == [True, True]
@@ -1,6 +1,14 @@
 """Viktor-Friday orchestrator package."""
 
-from vfriday.app import create_app
+from typing import Any
 
 __all__ = ["create_app"]
 
+
+def __getattr__(name: str) -> Any:
+    # Lazy so that importing a submodule (storage, skills engine, ...) does not load FastAPI.
+    if name == "create_app":
+        from vfriday.app import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
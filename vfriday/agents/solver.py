@@ -69,7 +69,7 @@ def _heuristic_solver(problem_text: str, working_text: str, model: str) -> Solve
         error_step = 2
         explanation = "Verify sign convention and axis orientation before summing forces."
 
-    return SolverResult(
+    return SolverResult.model_construct(
         status="ok",
         model=model,
         explanation=explanation,
@@ -64,7 +64,7 @@ def compose_hint(
         flags = ["heuristic_tutor"]
         if verifier_disagreement >= 0.5:
             flags.append("uncertain_mode")
-        return TutorResult(
+        return TutorResult.model_construct(
             model=model,
             message=msg,
             confidence=0.52 if verifier_disagreement < 0.5 else 0.40,
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import FastAPI, HTTPException
 
 from vfriday.pipeline import Orchestrator
@@ -21,10 +24,17 @@ from vfriday.storage import Storage
 def create_app() -> FastAPI:
     """Application factory."""
     settings = load_settings()
-    storage = Storage(settings.db_path, settings.audit_jsonl_path)
+    storage = Storage(settings.db_path, settings.audit_jsonl_path, async_writes=True)
     orchestrator = Orchestrator(settings, storage)
 
-    app = FastAPI(title="Viktor-Friday Orchestrator", version="0.1.0")
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        # Only a served app warms the ingest path; building one (tests, scripts) starts no workers.
+        orchestrator.warm()
+        yield
+        storage.close()
+
+    app = FastAPI(title="Viktor-Friday Orchestrator", version="0.1.0", lifespan=lifespan)
     app.state.settings = settings
     app.state.storage = storage
     app.state.orchestrator = orchestrator
@@ -60,7 +70,13 @@ def create_app() -> FastAPI:
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Any:
+    # ``vfriday.app:app`` for uvicorn, built on first access so importing this module has no side effects.
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
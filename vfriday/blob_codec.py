@@ -0,0 +1,62 @@
+"""Compression for binary payload blobs with an optional zstandard fast path."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import zstandard
+
+    _HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    _HAS_ZSTD = False
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+def compress(raw: bytes) -> Tuple[str, bytes]:
+    """Return ``(codec, data)``; already-compressed input (JPEG, PNG) is kept raw."""
+    if _HAS_ZSTD:
+        codec, data = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        codec, data = "zlib", zlib.compress(raw, ZLIB_LEVEL)
+    if len(data) >= len(raw):
+        return "raw", raw
+    return codec, data
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    """Inverse of ``compress``; raises ValueError for codecs this build cannot read."""
+    if codec == "raw":
+        return bytes(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if not _HAS_ZSTD:
+            raise ValueError("blob_codec_unavailable:zstd")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"blob_codec_unknown:{codec}")
+
+
+def split_image(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes], Optional[str]]:
+    """Move a base64 ``image_base64`` out of a JSON payload into a compressed blob.
+
+    Returns ``(payload_without_image, blob, codec)``. Only strings that round-trip
+    exactly are moved; anything else stays in the payload and blob is None.
+    """
+    image = payload.get("image_base64")
+    if not isinstance(image, str) or not image:
+        return payload, None, None
+    try:
+        raw = base64.b64decode(image, validate=True)
+    except (binascii.Error, ValueError):
+        return payload, None, None
+    if base64.b64encode(raw) != image.encode("ascii"):
+        return payload, None, None
+    codec, blob = compress(raw)
+    return {k: v for k, v in payload.items() if k != "image_base64"}, blob, codec
@@ -54,7 +54,7 @@ def evaluate_hidden_score(
     if score < 0.45:
         flags.append("hidden_score_low")
 
-    return GoodhartScore(
+    return GoodhartScore.model_construct(
         hidden_score=score,
         leakage_penalty=penalty,
         flags=flags,
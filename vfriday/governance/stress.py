@@ -2,24 +2,29 @@
 
 from __future__ import annotations
 
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Tuple, Union
+
+# Weight table frozen once per policy: ((factor_key, non-negative weight), ...).
+StressWeights = Tuple[Tuple[str, float], ...]
 
 
 def _clamp01(value: float) -> float:
     return max(0.0, min(1.0, float(value)))
 
 
-def weighted_stress(factors: Dict[str, float], weights: Dict[str, float]) -> float:
+def compile_weights(weights: Mapping[str, float] | None) -> StressWeights:
+    """Freeze a policy weight mapping into the form consumed by weighted_stress."""
+    return tuple((str(key), max(0.0, float(weight))) for key, weight in (weights or {}).items())
+
+
+def weighted_stress(factors: Dict[str, float], weights: Union[Mapping[str, float], StressWeights]) -> float:
     """Compute weighted stress in [0..1]. Missing factors default to 0."""
-    w_total = 0.0
-    score = 0.0
-    for key, weight in (weights or {}).items():
-        w = max(0.0, float(weight))
-        v = _clamp01(float((factors or {}).get(key, 0.0)))
-        score += v * w
-        w_total += w
+    pairs = weights if isinstance(weights, tuple) else compile_weights(weights)
+    w_total = sum(w for _key, w in pairs)
     if w_total <= 0:
         return 0.0
+    get = (factors or {}).get
+    score = sum(_clamp01(get(key, 0.0)) * w for key, w in pairs)
     return _clamp01(score / w_total)
 
 
@@ -63,8 +68,8 @@ def compute_shared_stress(
     *,
     ai_factors: Dict[str, float],
     viktor_factors: Dict[str, float],
-    stress_weights_ai: Dict[str, float],
-    stress_weights_viktor: Dict[str, float],
+    stress_weights_ai: Union[Mapping[str, float], StressWeights],
+    stress_weights_viktor: Union[Mapping[str, float], StressWeights],
 ) -> Tuple[float, float]:
     """Compute both AI and Viktor stress values."""
     return (
@@ -0,0 +1,90 @@
+"""JSON encode/decode helpers with an optional orjson fast path."""
+
+from __future__ import annotations
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, Mapping, Tuple
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    _HAS_ORJSON = False
+
+# Small flat mappings (e.g. setpoints) with only these value types are memoized.
+_FLAT_SCALARS = (str, int, float, bool, type(None))
+_FLAT_MAX_KEYS = 16
+
+
+def _has_non_finite(data: Any) -> bool:
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    return False
+
+
+def dumps_bytes(data: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Encode ``data`` as UTF-8 JSON, keeping non-ASCII text verbatim.
+
+    NaN and Infinity are written as the stdlib does (bare tokens), so they
+    read back unchanged instead of turning into null.
+    """
+    if _HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            encoded = orjson.dumps(data, option=option)
+        except TypeError:
+            # orjson rejects some values stdlib accepts (e.g. ints over 64 bits).
+            pass
+        else:
+            # orjson writes non-finite floats as null; the data is only walked when a null appears.
+            if b"null" not in encoded or not _has_non_finite(data):
+                return encoded
+    text = json.dumps(data, ensure_ascii=False, indent=2 if indent else None, sort_keys=sort_keys)
+    return text.encode("utf-8")
+
+
+def dumps(data: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    """Encode ``data`` as a JSON string."""
+    return dumps_bytes(data, indent=indent, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode JSON text or UTF-8 bytes."""
+    if _HAS_ORJSON:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Rows written by the stdlib encoder may hold NaN/Infinity, which orjson rejects.
+            pass
+    return json.loads(data)
+
+
+@lru_cache(maxsize=1024)
+def _dumps_flat(items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    return dumps({key: value for key, _cls, value in items}, sort_keys=True)
+
+
+def dumps_sorted(data: Mapping[str, Any]) -> str:
+    """Sorted-key JSON string, memoized for small flat mappings on the stdlib path.
+
+    With orjson, encoding is cheaper than building the cache key, so the
+    cache is skipped. The value type is part of the key so that ``True``,
+    ``1`` and ``1.0`` never share an entry.
+    """
+    if not _HAS_ORJSON and len(data) <= _FLAT_MAX_KEYS and all(isinstance(key, str) for key in data):
+        items = tuple((key, value.__class__, value) for key, value in sorted(data.items()))
+        if all(cls in _FLAT_SCALARS for _key, cls, _value in items):
+            return _dumps_flat(items)
+    return dumps(data, sort_keys=True)
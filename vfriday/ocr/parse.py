@@ -82,7 +82,7 @@ def prepare_ocr_payload(
         normalized_problem = "(problem text unavailable; ask student to provide statement)"
         source = "missing_problem"
 
-    return OCRPrepResult(
+    return OCRPrepResult.model_construct(
         normalized_problem=normalized_problem,
         normalized_working=normalized_working,
         source=source,
@@ -2,15 +2,16 @@
 
 from __future__ import annotations
 
-import json
-import uuid
-from datetime import datetime, timezone
+import sys
+import threading
+import time
+from datetime import datetime
+from itertools import chain
 from pathlib import Path
+from secrets import token_hex
 from typing import Any, Dict, List, Tuple
 
-from vfriday.agents.solver import solve as solver_solve
-from vfriday.agents.tutor import compose_hint
-from vfriday.benchmark.runner import run_benchmark
+from vfriday import json_codec
 from vfriday.governance.goodhart import (
     evaluate_hidden_score,
     model_observed_setpoint_targets,
@@ -18,26 +19,77 @@ from vfriday.governance.goodhart import (
 )
 from vfriday.governance.hint_guard import apply_hint_guard
 from vfriday.governance.setpoints import update_setpoints
-from vfriday.governance.stress import compute_shared_stress, make_ai_factors, make_viktor_factors
-from vfriday.ocr.parse import prepare_ocr_payload
+from vfriday.governance.stress import compile_weights, compute_shared_stress, make_ai_factors, make_viktor_factors
 from vfriday.schemas import (
     BenchmarkRunResult,
+    GoodhartScore,
     IngestEventRequest,
+    OCRPrepResult,
     Session,
     SessionCreateRequest,
     SessionState,
     SolverResult,
     TriggerType,
+    TutorResult,
     TutorTurnResponse,
+    VerifierResult,
 )
 from vfriday.settings import VFridaySettings
 from vfriday.storage import Storage
 from vfriday.telemetry.triggers import normalize_trigger
-from vfriday.verifier.sympy_engine import verify_solver_claims
+from vfriday.verifier import pool as verifier_pool
+
+# Pipeline-level response flags, interned once so per-turn merging reuses them.
+FLAG_SESSION_NOT_FOUND = sys.intern("session_not_found")
+FLAG_BUDGET_CAP_REACHED = sys.intern("budget_cap_reached")
+FLAG_VERIFIER_DISAGREEMENT = sys.intern("verifier_disagreement")
 
 
 def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Same shape as datetime.now(timezone.utc).isoformat(), without building datetime objects.
+    now = time.time()
+    secs = int(now)
+    tm = time.gmtime(secs)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{int((now - secs) * 1_000_000):06d}+00:00"
+    )
+
+
+# Agent, OCR and benchmark modules pull in LLM clients and are only needed on
+# the ingest/benchmark paths, so they are imported on first call.
+
+
+def solver_solve(**kwargs: Any) -> SolverResult:
+    from vfriday.agents.solver import solve
+
+    return solve(**kwargs)
+
+
+def compose_hint(**kwargs: Any) -> TutorResult:
+    from vfriday.agents.tutor import compose_hint as _compose_hint
+
+    return _compose_hint(**kwargs)
+
+
+def prepare_ocr_payload(**kwargs: Any) -> OCRPrepResult:
+    from vfriday.ocr.parse import prepare_ocr_payload as _prepare_ocr_payload
+
+    return _prepare_ocr_payload(**kwargs)
+
+
+def run_benchmark(**kwargs: Any) -> Tuple[str, Dict[str, Any], str]:
+    from vfriday.benchmark.runner import run_benchmark as _run_benchmark
+
+    return _run_benchmark(**kwargs)
+
+
+def _warm_ingest_path() -> None:
+    import vfriday.agents.solver  # noqa: F401
+    import vfriday.agents.tutor  # noqa: F401
+    import vfriday.ocr.parse  # noqa: F401
+
+    verifier_pool.warm()
 
 
 class Orchestrator:
@@ -46,15 +98,29 @@ class Orchestrator:
     def __init__(self, settings: VFridaySettings, storage: Storage):
         self.settings = settings
         self.storage = storage
+        # Policy is fixed for the process lifetime; freeze what ingest reads every turn.
+        policy = settings.policy
+        self._default_setpoints = {k: float(v) for k, v in (policy.get("setpoints", {}) or {}).items()}
+        self._weights_ai = compile_weights(policy.get("stress_weights_ai", {}) or {})
+        self._weights_viktor = compile_weights(policy.get("stress_weights_viktor", {}) or {})
+        thresholds = policy.get("stress_thresholds", {}) or {}
+        self._sla_ms = int(thresholds.get("latency_sla_ms", 8000))
+        self._idle_threshold = float(thresholds.get("idle_threshold_seconds", 40.0))
+
+    def warm(self) -> None:
+        """Load the lazy ingest modules and start the verifier workers in the background.
+
+        Call when the process is about to serve ingest traffic.
+        """
+        threading.Thread(target=_warm_ingest_path, name="vfriday-warmup", daemon=True).start()
 
     def create_session(self, req: SessionCreateRequest) -> Session:
-        setpoints = self.settings.policy.get("setpoints", {})
         created = self.storage.create_session(
             student_alias=req.student_alias,
             topic=req.topic,
             grade_level=req.grade_level,
             goal=req.goal,
-            active_setpoints={k: float(v) for k, v in setpoints.items()},
+            active_setpoints=dict(self._default_setpoints),
         )
         return Session(
             session_id=created["session_id"],
@@ -77,7 +143,7 @@ class Orchestrator:
         return solver_result.model_dump()
 
     def _recent_error_types(self, session_id: str, limit: int = 10) -> List[str]:
-        events = self.storage.get_recent_events(session_id, limit=limit)
+        events = self.storage.get_recent_events(session_id, limit=limit, fields=("solver_error_type",))
         out: List[str] = []
         for evt in events:
             payload = evt.get("payload") or {}
@@ -90,8 +156,85 @@ class Orchestrator:
     def _has_student_attempt(req: IngestEventRequest) -> bool:
         return bool((req.user_message or "").strip() or (req.ocr_text or "").strip() or (req.latex_text or "").strip())
 
+    def _record_cost(
+        self,
+        trace_id: str,
+        session_id: str,
+        category: str,
+        usage: Dict[str, Any] | None,
+        model: str,
+        metadata: Dict[str, Any],
+    ) -> None:
+        # Called as soon as each paid call returns, so spend reaches the ledger
+        # even if a later pipeline step raises.
+        cost = float((usage or {}).get("cost") or 0.0)
+        if cost > 0:
+            self.storage.add_budget_entry(trace_id, session_id, category, cost, model, metadata)
+
+    def _next_setpoints(
+        self,
+        *,
+        session: Dict[str, Any],
+        current: Dict[str, float],
+        goodhart: GoodhartScore,
+        verifier: VerifierResult,
+        non_transfer: float,
+    ) -> Dict[str, Any]:
+        observed_targets = model_observed_setpoint_targets(
+            goodhart=goodhart,
+            verifier_disagreement_rate=verifier.disagreement_rate,
+            non_transfer_rate=non_transfer,
+        )
+        setpoint_update_cfg = self.settings.policy.get("setpoint_update", {}) or {}
+        new_setpoints, drift_map = update_setpoints(
+            current=current,
+            observed=observed_targets,
+            ewma_alpha=float(setpoint_update_cfg.get("ewma_alpha", 0.15)),
+            max_daily_drift=float(setpoint_update_cfg.get("max_daily_drift", 0.05)),
+            now_iso=_utc_now_iso(),
+            previous_updated_at=str(session.get("updated_at") or ""),
+        )
+        return {
+            "setpoints": new_setpoints,
+            "observed_targets": observed_targets,
+            "drift_map": drift_map,
+        }
+
+    def _compute_stress(
+        self,
+        *,
+        verifier: VerifierResult,
+        repeated_confusion: float,
+        leakage_penalty: float,
+        latency_ms: int,
+        non_transfer: float,
+        idle_seconds: float,
+        post_hint_progress: bool,
+    ) -> Tuple[float, float, Dict[str, Dict[str, float]]]:
+        ai_factors = make_ai_factors(
+            verifier_disagreement_rate=verifier.disagreement_rate,
+            repeated_confusion_after_hints=repeated_confusion,
+            direct_answer_pressure_incidents=1.0 if leakage_penalty > 0 else 0.0,
+            latency_ms=latency_ms,
+            sla_ms=self._sla_ms,
+            non_transfer_recurrence=non_transfer,
+        )
+        viktor_factors = make_viktor_factors(
+            idle_seconds=idle_seconds,
+            idle_threshold_seconds=self._idle_threshold,
+            hint_to_progress_lag=0.0 if post_hint_progress else 0.5,
+            repeated_error_signature=non_transfer,
+        )
+        stress_ai, stress_viktor = compute_shared_stress(
+            ai_factors=ai_factors,
+            viktor_factors=viktor_factors,
+            stress_weights_ai=self._weights_ai,
+            stress_weights_viktor=self._weights_viktor,
+        )
+        return stress_ai, stress_viktor, {"ai": ai_factors, "viktor": viktor_factors}
+
     def ingest(self, session_id: str, req: IngestEventRequest) -> TutorTurnResponse:
-        trace_id = uuid.uuid4().hex[:12]
+        trace_id = token_hex(6)
         session = self.storage.get_session(session_id)
         if not session:
             return TutorTurnResponse(
@@ -99,7 +242,7 @@ class Orchestrator:
                 tutor_message=f"Unknown session: {session_id}",
                 confidence=0.0,
                 requires_attempt=True,
-                flags=["session_not_found"],
+                flags=[FLAG_SESSION_NOT_FOUND],
                 trace_id=trace_id,
             )
 
@@ -111,7 +254,7 @@ class Orchestrator:
                 tutor_message="Бюджетный лимит достигнут. Нужен апрув Meta-Governor перед продолжением.",
                 confidence=0.0,
                 requires_attempt=True,
-                flags=["budget_cap_reached"],
+                flags=[FLAG_BUDGET_CAP_REACHED],
                 trace_id=trace_id,
             )
 
@@ -143,56 +286,26 @@ class Orchestrator:
             image_base64=req.image_base64,
             ocr_model=str(self.settings.models.get("ocr_model", "")),
         )
-        if float((ocr.usage or {}).get("cost") or 0.0) > 0:
-            self.storage.add_budget_entry(
-                trace_id,
-                session_id,
-                "ocr",
-                float(ocr.usage.get("cost") or 0.0),
-                str(self.settings.models.get("ocr_model")),
-                {"source": ocr.source},
-            )
-
+        self._record_cost(
+            trace_id, session_id, "ocr", ocr.usage, str(self.settings.models.get("ocr_model")), {"source": ocr.source}
+        )
         solver = solver_solve(
             problem_text=ocr.normalized_problem,
             working_text=ocr.normalized_working,
             model=str(self.settings.models.get("solver_model")),
             reasoning_effort="high",
         )
-        self.storage.save_solver_run(
-            trace_id=trace_id,
-            session_id=session_id,
-            model=solver.model,
-            status=solver.status,
-            latency_ms=solver.latency_ms,
-            usage=solver.usage,
-            response=solver.model_dump(),
-        )
-        if float((solver.usage or {}).get("cost") or 0.0) > 0:
-            self.storage.add_budget_entry(
-                trace_id,
-                session_id,
-                "solver",
-                float(solver.usage.get("cost") or 0.0),
-                solver.model,
-                {"status": solver.status},
-            )
-
-        verifier = verify_solver_claims(solver.symbolic_claims)
-        self.storage.save_verifier_run(
-            trace_id=trace_id,
-            session_id=session_id,
-            checked_claims=verifier.checked_claims,
-            passed_claims=verifier.passed_claims,
-            failed_claims=verifier.failed_claims,
-            disagreement_rate=verifier.disagreement_rate,
-            response=verifier.model_dump(),
-        )
+        self._record_cost(trace_id, session_id, "solver", solver.usage, solver.model, {"status": solver.status})
+        pending_verification = verifier_pool.submit(solver.symbolic_claims)
 
+        # Reads happen before the write group below, which only collects writes;
+        # they overlap verification.
         setpoints_current = self.storage.get_latest_setpoints(
             session_id=session_id,
-            fallback={k: float(v) for k, v in (self.settings.policy.get("setpoints", {}) or {}).items()},
+            fallback=self._default_setpoints,
         )
+        recent_errors = self._recent_error_types(session_id, limit=12)
+        verifier = pending_verification.result()
 
         tutor = compose_hint(
             problem_text=ocr.normalized_problem,
@@ -203,15 +316,7 @@ class Orchestrator:
             model=str(self.settings.models.get("tutor_model")),
             policy=self.settings.policy,
         )
-        if float((tutor.usage or {}).get("cost") or 0.0) > 0:
-            self.storage.add_budget_entry(
-                trace_id,
-                session_id,
-                "tutor",
-                float(tutor.usage.get("cost") or 0.0),
-                tutor.model,
-                {"confidence": tutor.confidence},
-            )
+        self._record_cost(trace_id, session_id, "tutor", tutor.usage, tutor.model, {"confidence": tutor.confidence})
 
         guarded_msg, guard_flags, leakage_penalty = apply_hint_guard(
             tutor.message,
@@ -219,7 +324,6 @@ class Orchestrator:
             policy=self.settings.policy,
         )
 
-        recent_errors = self._recent_error_types(session_id, limit=12)
         non_transfer = non_transfer_recurrence(solver.error_type, recent_errors)
         repeated_confusion = 1.0 if (trigger == TriggerType.HELP_REQUEST and len(recent_errors) >= 2 and non_transfer >= 0.5) else 0.0
         post_hint_progress = self._has_student_attempt(req) and trigger != TriggerType.HELP_REQUEST
@@ -231,95 +335,82 @@ class Orchestrator:
             post_hint_progress=post_hint_progress,
             requires_attempt=bool(tutor.requires_attempt),
         )
-
-        observed_targets = model_observed_setpoint_targets(
-            goodhart=goodhart,
-            verifier_disagreement_rate=verifier.disagreement_rate,
-            non_transfer_rate=non_transfer,
-        )
-        setpoint_update_cfg = self.settings.policy.get("setpoint_update", {}) or {}
-        new_setpoints, drift_map = update_setpoints(
+        setpoint_snapshot = self._next_setpoints(
+            session=session,
             current=setpoints_current,
-            observed=observed_targets,
-            ewma_alpha=float(setpoint_update_cfg.get("ewma_alpha", 0.15)),
-            max_daily_drift=float(setpoint_update_cfg.get("max_daily_drift", 0.05)),
-            now_iso=_utc_now_iso(),
-            previous_updated_at=str(session.get("updated_at") or ""),
-        )
-        self.storage.update_session_setpoints(session_id, new_setpoints)
-        self.storage.save_setpoint_snapshot(
-            session_id,
-            {
-                "setpoints": new_setpoints,
-                "observed_targets": observed_targets,
-                "drift_map": drift_map,
-                "trace_id": trace_id,
-            },
+            goodhart=goodhart,
+            verifier=verifier,
+            non_transfer=non_transfer,
         )
 
-        ai_factors = make_ai_factors(
-            verifier_disagreement_rate=verifier.disagreement_rate,
-            repeated_confusion_after_hints=repeated_confusion,
-            direct_answer_pressure_incidents=1.0 if leakage_penalty > 0 else 0.0,
+        stress_ai, stress_viktor, stress_factors = self._compute_stress(
+            verifier=verifier,
+            repeated_confusion=repeated_confusion,
+            leakage_penalty=leakage_penalty,
             latency_ms=tutor.latency_ms + solver.latency_ms,
-            sla_ms=8000,
-            non_transfer_recurrence=non_transfer,
-        )
-        viktor_factors = make_viktor_factors(
+            non_transfer=non_transfer,
             idle_seconds=float(req.idle_seconds or 0.0),
-            idle_threshold_seconds=40.0,
-            hint_to_progress_lag=0.0 if post_hint_progress else 0.5,
-            repeated_error_signature=non_transfer,
-        )
-        stress_ai, stress_viktor = compute_shared_stress(
-            ai_factors=ai_factors,
-            viktor_factors=viktor_factors,
-            stress_weights_ai=(self.settings.policy.get("stress_weights_ai", {}) or {}),
-            stress_weights_viktor=(self.settings.policy.get("stress_weights_viktor", {}) or {}),
-        )
-        self.storage.save_stress_snapshot(
-            session_id=session_id,
-            stress_ai=stress_ai,
-            stress_viktor=stress_viktor,
-            factors={"ai": ai_factors, "viktor": viktor_factors, "trace_id": trace_id},
+            post_hint_progress=post_hint_progress,
         )
 
-        flags = sorted(
-            set(
-                list(tutor.flags)
-                + list(guard_flags)
-                + list(goodhart.flags)
-                + (["verifier_disagreement"] if verifier.disagreement_rate >= 0.5 else [])
-            )
-        )
+        extra_flags = (FLAG_VERIFIER_DISAGREEMENT,) if verifier.disagreement_rate >= 0.5 else ()
+        flags = sorted(dict.fromkeys(chain(tutor.flags, guard_flags, goodhart.flags, extra_flags)))
 
-        self.storage.save_tutor_turn(
-            trace_id=trace_id,
-            session_id=session_id,
-            model=tutor.model,
-            tutor_message=guarded_msg,
-            confidence=tutor.confidence,
-            requires_attempt=tutor.requires_attempt,
-            flags=flags,
-            hidden_score=goodhart.hidden_score,
-            leakage_penalty=goodhart.leakage_penalty,
-            usage=tutor.usage,
-            latency_ms=tutor.latency_ms,
-        )
-        self.storage.save_event(
-            trace_id,
-            session_id,
-            "pipeline_completed",
-            {
-                "trigger_type": trigger.value,
-                "solver_error_type": solver.error_type,
-                "verifier_disagreement": verifier.disagreement_rate,
-                "hidden_score": goodhart.hidden_score,
-                "stress_ai": stress_ai,
-                "stress_viktor": stress_viktor,
-                "flags": flags,
-            },
-        )
+        # One unit on this session's writer lane: committed together, off the response path.
+        with self.storage.write_group(session_id):
+            self.storage.save_solver_run(
+                trace_id=trace_id,
+                session_id=session_id,
+                model=solver.model,
+                status=solver.status,
+                latency_ms=solver.latency_ms,
+                usage=solver.usage,
+                response=solver.model_dump(),
+            )
+            self.storage.save_verifier_run(
+                trace_id=trace_id,
+                session_id=session_id,
+                checked_claims=verifier.checked_claims,
+                passed_claims=verifier.passed_claims,
+                failed_claims=verifier.failed_claims,
+                disagreement_rate=verifier.disagreement_rate,
+                response=verifier.model_dump(),
+            )
+            self.storage.update_session_setpoints(session_id, setpoint_snapshot["setpoints"])
+            self.storage.save_setpoint_snapshot(session_id, {**setpoint_snapshot, "trace_id": trace_id})
+            self.storage.save_stress_snapshot(
+                session_id=session_id,
+                stress_ai=stress_ai,
+                stress_viktor=stress_viktor,
+                factors={**stress_factors, "trace_id": trace_id},
+            )
+            self.storage.save_tutor_turn(
+                trace_id=trace_id,
+                session_id=session_id,
+                model=tutor.model,
+                tutor_message=guarded_msg,
+                confidence=tutor.confidence,
+                requires_attempt=tutor.requires_attempt,
+                flags=flags,
+                hidden_score=goodhart.hidden_score,
+                leakage_penalty=goodhart.leakage_penalty,
+                usage=tutor.usage,
+                latency_ms=tutor.latency_ms,
+            )
+            self.storage.save_event(
+                trace_id,
+                session_id,
+                "pipeline_completed",
+                {
+                    "trigger_type": trigger.value,
+                    "solver_error_type": solver.error_type,
+                    "verifier_disagreement": verifier.disagreement_rate,
+                    "hidden_score": goodhart.hidden_score,
+                    "stress_ai": stress_ai,
+                    "stress_viktor": stress_viktor,
+                    "flags": flags,
+                },
+            )
 
         status = "ok"
         if verifier.disagreement_rate >= 0.5 or tutor.confidence < 0.45:
@@ -350,7 +441,7 @@ class Orchestrator:
         return SessionState(
             setpoints=self.storage.get_latest_setpoints(
                 session_id,
-                fallback={k: float(v) for k, v in (self.settings.policy.get("setpoints", {}) or {}).items()},
+                fallback=self._default_setpoints,
             ),
             stress=self.storage.get_latest_stress(session_id),
             last_events=self.storage.get_recent_events(session_id, limit=10),
@@ -389,16 +480,14 @@ class Orchestrator:
             "summary": summary,
             "action": "Prepare PR proposal only. No auto-merge.",
         }
-        out_path.write_text(
+        header = (
             "# Viktor-Friday Benchmark Report\n\n"
             f"## Report ID\n`{report_id}`\n\n"
             f"## Recommendation\n{recommendation}\n\n"
             "## Summary (JSON)\n"
             "```json\n"
-            f"{json.dumps(payload, ensure_ascii=False, indent=2)}\n"
-            "```\n",
-            encoding="utf-8",
         )
+        out_path.write_bytes(header.encode("utf-8") + json_codec.dumps_bytes(payload, indent=True) + b"\n```\n")
 
     def run_retention(self, retention_days: int = 30) -> Dict[str, Any]:
         return self.storage.run_retention(retention_days=retention_days)
@@ -6,7 +6,12 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Internal pipeline contracts are built from trusted values; producers that
+# already hold well-typed data use ``Model.model_construct`` to skip validation.
+# API boundary models keep the default (validating) configuration.
+_INTERNAL_MODEL_CONFIG = ConfigDict(extra="ignore", frozen=False, validate_assignment=False)
 
 
 class TriggerType(str, Enum):
@@ -85,6 +90,8 @@ class BenchmarkRunResult(BaseModel):
 class OCRPrepResult(BaseModel):
     """Normalized OCR+text output used by solver stage."""
 
+    model_config = _INTERNAL_MODEL_CONFIG
+
     normalized_problem: str
     normalized_working: str
     source: str
@@ -106,6 +113,8 @@ class SolverClaim(BaseModel):
 class SolverResult(BaseModel):
     """Solver output consumed by verifier/tutor."""
 
+    model_config = _INTERNAL_MODEL_CONFIG
+
     status: str = "ok"
     model: str
     explanation: str
@@ -122,6 +131,8 @@ class SolverResult(BaseModel):
 class VerifierResult(BaseModel):
     """Verifier summary over solver claims."""
 
+    model_config = _INTERNAL_MODEL_CONFIG
+
     status: str = "ok"
     checked_claims: int = 0
     passed_claims: int = 0
@@ -133,6 +144,8 @@ class VerifierResult(BaseModel):
 class TutorResult(BaseModel):
     """Tutor draft after policy and guard layers."""
 
+    model_config = _INTERNAL_MODEL_CONFIG
+
     model: str
     message: str
     confidence: float = Field(default=0.55, ge=0.0, le=1.0)
@@ -145,6 +158,8 @@ class TutorResult(BaseModel):
 class GoodhartScore(BaseModel):
     """Hidden evaluator output used for governance metrics."""
 
+    model_config = _INTERNAL_MODEL_CONFIG
+
     hidden_score: float = Field(default=0.0, ge=0.0, le=1.0)
     leakage_penalty: float = Field(default=0.0, ge=0.0, le=1.0)
     flags: List[str] = Field(default_factory=list)
@@ -47,6 +47,10 @@ _DEFAULT_POLICY = {
         "latency_over_sla": 0.20,
         "non_transfer_recurrence": 0.15,
     },
+    "stress_thresholds": {
+        "latency_sla_ms": 8000,
+        "idle_threshold_seconds": 40.0,
+    },
     "stress_weights_viktor": {
         "idle_blocks_over_threshold": 0.35,
         "hint_to_progress_lag": 0.35,
@@ -2,17 +2,32 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from vfriday.skills_engine.backup import clear_backup, create_backup, restore_backup
 from vfriday.skills_engine.manifest import SkillManifest, read_manifest
-from vfriday.skills_engine.merge import copy_file, merge_file
-from vfriday.skills_engine.state import base_dir, compute_file_hash, init_skills_state, load_state, record_skill_application
+from vfriday.skills_engine.merge import MergeResult, copy_file, ensure_parent, fast_clone, merge_file
+from vfriday.skills_engine.state import (
+    base_dir,
+    compute_file_hash,
+    init_skills_state,
+    load_state,
+    record_skill_application,
+    resolve_root,
+)
 from vfriday.skills_engine.structured import apply_structured_ops
 
+_MERGE_WORKERS = 8
+
+_merge_pool: Optional[ThreadPoolExecutor] = None
+_merge_pool_lock = threading.Lock()
+
 
 @dataclass(frozen=True)
 class ApplyResult:
@@ -51,48 +66,91 @@ def _run_shell(command: str, cwd: Path) -> None:
         raise RuntimeError(f"command_failed:{command}:{msg}")
 
 
+def _batch_exists(paths: Iterable[Path]) -> Dict[Path, bool]:
+    """Stat every path once up front so apply never re-probes the same file."""
+    existence: Dict[Path, bool] = {}
+    for path in paths:
+        try:
+            os.stat(path)
+        except OSError:
+            # Path.exists() semantics: ENOENT, ELOOP, EACCES and friends all read as "not there".
+            existence[path] = False
+        else:
+            existence[path] = True
+    return existence
+
+
+def _get_merge_pool() -> ThreadPoolExecutor:
+    """Return the shared merge pool, starting it on first use."""
+    global _merge_pool
+    with _merge_pool_lock:
+        if _merge_pool is None:
+            _merge_pool = ThreadPoolExecutor(max_workers=_MERGE_WORKERS, thread_name_prefix="vfriday-merge")
+        return _merge_pool
+
+
+def _run_merges(jobs: List[Tuple[Path, Path, Path]]) -> List[MergeResult]:
+    """Run independent three-way merges, overlapping them on the shared thread pool."""
+    if len(jobs) <= 1:
+        return [merge_file(current=c, base=b, theirs=t) for c, b, t in jobs]
+    return list(_get_merge_pool().map(lambda job: merge_file(current=job[0], base=job[1], theirs=job[2]), jobs))
+
+
 def apply_skill(project_root: Path, skill_dir: Path) -> ApplyResult:
     """Apply a skill package with deterministic flow and rollback safety."""
-    root = Path(project_root).resolve()
+    resolved = resolve_root(project_root)
+    root = resolved.path
     sdir = Path(skill_dir).resolve()
-    state = init_skills_state(root)
+    state = init_skills_state(resolved)
     manifest = read_manifest(sdir)
     _check_dependencies(manifest, state)
     _check_conflicts(manifest, state)
 
-    bdir = base_dir(root)
+    bdir = base_dir(resolved)
     conflict_files: List[str] = []
 
-    files_to_backup = set()
-    for rel in manifest.adds + manifest.modifies:
-        files_to_backup.add((root / rel).resolve())
-    files_to_backup.add((root / ".env.example").resolve())
-    files_to_backup.add((root / "requirements.txt").resolve())
+    all_rels = (*manifest.adds, *manifest.modifies)
+    files_to_backup = {(root / rel).resolve() for rel in (*all_rels, ".env.example", "requirements.txt")}
+
+    exists = _batch_exists(
+        [sdir / "add" / rel for rel in manifest.adds]
+        + [p for rel in manifest.modifies for p in (root / rel, bdir / rel, sdir / "modify" / rel)]
+    )
 
-    create_backup(root, files_to_backup)
+    create_backup(resolved, files_to_backup)
     try:
         for rel in manifest.adds:
             src = sdir / "add" / rel
             dst = root / rel
-            if not src.exists():
+            if not exists[src]:
                 raise FileNotFoundError(f"skill_add_file_missing:{src}")
-            copy_file(src, dst)
+            ensure_parent(dst)
+            fast_clone(src, dst)
+            exists[dst] = True
 
+        merge_rels: List[str] = []
+        merge_jobs: List[Tuple[Path, Path, Path]] = []
         for rel in manifest.modifies:
             current = root / rel
             base = bdir / rel
             theirs = sdir / "modify" / rel
-            if not theirs.exists():
+            if not exists[theirs]:
                 raise FileNotFoundError(f"skill_modify_file_missing:{theirs}")
 
-            if not current.exists():
+            if not exists[current]:
                 copy_file(theirs, current)
+                exists[current] = True
                 continue
 
-            if not base.exists():
+            if not exists[base]:
                 copy_file(current, base)
+                exists[base] = True
 
-            result = merge_file(current=current, base=base, theirs=theirs)
+            merge_rels.append(rel)
+            merge_jobs.append((current, base, theirs))
+
+        # Results come back in manifest order, so conflict reporting stays deterministic.
+        for rel, result in zip(merge_rels, _run_merges(merge_jobs)):
             if result.conflicted:
                 conflict_files.append(rel)
 
@@ -100,7 +158,7 @@ def apply_skill(project_root: Path, skill_dir: Path) -> ApplyResult:
             raise RuntimeError(f"skill_merge_conflicts:{','.join(conflict_files)}")
 
         structured_outcomes = apply_structured_ops(
-            project_root=root,
+            project_root=resolved,
             env_additions=manifest.structured.env_additions,
             python_dependencies=manifest.structured.python_dependencies,
         )
@@ -111,19 +169,21 @@ def apply_skill(project_root: Path, skill_dir: Path) -> ApplyResult:
             _run_shell(manifest.test, cwd=root)
 
         file_hashes: Dict[str, str] = {}
-        for rel in manifest.adds + manifest.modifies:
-            p = root / rel
-            if p.exists():
-                file_hashes[rel] = compute_file_hash(p)
+        for rel in all_rels:
+            try:
+                file_hashes[rel] = compute_file_hash(root / rel)
+            except FileNotFoundError:
+                # A post_apply command may legitimately remove a file.
+                continue
 
         record_skill_application(
-            root,
+            resolved,
             skill_name=manifest.skill,
             version=manifest.version,
             file_hashes=file_hashes,
             structured_outcomes=structured_outcomes,
         )
-        clear_backup(root)
+        clear_backup(resolved)
         return ApplyResult(
             success=True,
             skill=manifest.skill,
@@ -133,8 +193,8 @@ def apply_skill(project_root: Path, skill_dir: Path) -> ApplyResult:
             message="skill_applied",
         )
     except Exception as exc:
-        restore_backup(root)
-        clear_backup(root)
+        restore_backup(resolved)
+        clear_backup(resolved)
         return ApplyResult(
             success=False,
             skill=manifest.skill,
@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
-import json
+import io
 import shutil
+import tarfile
+import time
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Iterable, List, Tuple
 
-from vfriday.skills_engine.state import backup_dir
+from vfriday import json_codec
+from vfriday.skills_engine.state import backup_dir, resolve_root
 
 MANIFEST_FILE = "manifest.json"
+BACKUP_ARCHIVE = "backup.tar"
+# Backed-up files live under this prefix so a project file named manifest.json cannot collide.
+_FILES_PREFIX = "files/"
+# Members are validated by _restore_target before extraction, so keep their modes and
+# mtimes intact ("tar" would strip group/other write bits from restored files).
+_EXTRACT_KWARGS = {"filter": "fully_trusted"} if hasattr(tarfile, "fully_trusted_filter") else {}
 
 
 def _safe_rel(path: Path, root: Path) -> str:
@@ -19,59 +28,108 @@ def _safe_rel(path: Path, root: Path) -> str:
     return str(rel)
 
 
+def _restore_target(root: Path, rel: str) -> Path:
+    """Resolve a backed-up relative path, refusing anything that escapes ``root``."""
+    rel_path = Path(rel)
+    if not rel or rel_path.is_absolute() or ".." in rel_path.parts:
+        raise ValueError(f"unsafe_backup_path:{rel}")
+    target = root / rel_path
+    if not target.parent.resolve().is_relative_to(root):
+        raise ValueError(f"unsafe_backup_path:{rel}")
+    return target
+
+
 def create_backup(project_root: Path, files: Iterable[Path]) -> None:
     """Create backup for a list of target files."""
-    root = Path(project_root).resolve()
-    bdir = backup_dir(root)
+    resolved = resolve_root(project_root)
+    root = resolved.path
+    bdir = backup_dir(resolved)
     if bdir.exists():
         shutil.rmtree(bdir)
     bdir.mkdir(parents=True, exist_ok=True)
 
     manifest: List[dict] = []
+    members: List[Tuple[Path, str]] = []
     for target in files:
         t = Path(target).resolve()
-        if not str(t).startswith(str(root)):
+        if not t.is_relative_to(root):
             raise ValueError(f"backup_target_outside_project:{t}")
         rel = _safe_rel(t, root)
         exists = t.exists()
         entry = {"rel": rel, "exists": bool(exists)}
         if exists and t.is_file():
-            dst = bdir / rel
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(t, dst)
+            members.append((t, rel))
         manifest.append(entry)
 
-    (bdir / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
-def restore_backup(project_root: Path) -> None:
-    """Restore files from backup snapshot."""
-    root = Path(project_root).resolve()
-    bdir = backup_dir(root)
-    mp = bdir / MANIFEST_FILE
-    if not mp.exists():
-        return
-    manifest = json.loads(mp.read_text(encoding="utf-8"))
+    # One sequential archive instead of a mirrored tree; the manifest goes first so
+    # restore can read it before streaming the file members.
+    payload = json_codec.dumps_bytes(manifest, indent=True)
+    info = tarfile.TarInfo(MANIFEST_FILE)
+    info.size = len(payload)
+    info.mtime = int(time.time())
+    with tarfile.open(bdir / BACKUP_ARCHIVE, "w") as tf:
+        tf.addfile(info, io.BytesIO(payload))
+        for t, rel in members:
+            tf.add(t, arcname=_FILES_PREFIX + Path(rel).as_posix(), recursive=False)
+
+
+def _read_manifest(tf: tarfile.TarFile) -> Any:
+    first = tf.next()
+    if first is None or first.name != MANIFEST_FILE:
+        return None
+    fh = tf.extractfile(first)
+    return json_codec.loads(fh.read()) if fh is not None else None
+
+
+def _restore_legacy(root: Path, bdir: Path) -> None:
+    """Restore a backup written before the tar format: manifest.json plus a mirrored tree."""
+    manifest = json_codec.loads((bdir / MANIFEST_FILE).read_bytes())
     if not isinstance(manifest, list):
         return
-
     for row in manifest:
         rel = str(row.get("rel") or "")
-        existed = bool(row.get("exists"))
-        target = root / rel
+        target = _restore_target(root, rel)
         source = bdir / rel
-        if existed:
+        if row.get("exists"):
             if source.exists():
                 target.parent.mkdir(parents=True, exist_ok=True)
                 shutil.copy2(source, target)
-        else:
-            if target.exists() and target.is_file():
-                target.unlink()
+        elif target.exists() and target.is_file():
+            target.unlink()
+
+
+def restore_backup(project_root: Path) -> None:
+    """Restore files from backup snapshot."""
+    resolved = resolve_root(project_root)
+    root = resolved.path
+    bdir = backup_dir(resolved)
+    archive = bdir / BACKUP_ARCHIVE
+    if not archive.exists():
+        if (bdir / MANIFEST_FILE).exists():
+            _restore_legacy(root, bdir)
+        return
+    with tarfile.open(archive, "r") as tf:
+        manifest = _read_manifest(tf)
+        if not isinstance(manifest, list):
+            raise ValueError(f"invalid_backup_manifest:{archive}")
+        for row in manifest:
+            if not row.get("exists"):
+                target = _restore_target(root, str(row.get("rel") or ""))
+                if target.exists() and target.is_file():
+                    target.unlink()
+        for member in tf:
+            if not member.name.startswith(_FILES_PREFIX):
+                continue
+            if not member.isreg():
+                raise ValueError(f"unsafe_backup_member:{member.name}")
+            member.name = member.name[len(_FILES_PREFIX):]
+            _restore_target(root, member.name)
+            tf.extract(member, path=root, **_EXTRACT_KWARGS)
 
 
 def clear_backup(project_root: Path) -> None:
     """Delete backup directory."""
-    bdir = backup_dir(Path(project_root).resolve())
+    bdir = backup_dir(project_root)
     if bdir.exists():
         shutil.rmtree(bdir)
 
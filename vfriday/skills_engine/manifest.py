@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, List, Tuple
 
 import yaml
 
@@ -13,8 +15,8 @@ import yaml
 class StructuredOps:
     """Deterministic operations over structured files."""
 
-    env_additions: List[str] = field(default_factory=list)
-    python_dependencies: List[str] = field(default_factory=list)
+    env_additions: Tuple[str, ...] = ()
+    python_dependencies: Tuple[str, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -25,12 +27,12 @@ class SkillManifest:
     version: str
     description: str
     core_version: str
-    adds: List[str]
-    modifies: List[str]
+    adds: Tuple[str, ...]
+    modifies: Tuple[str, ...]
     structured: StructuredOps
-    depends: List[str]
-    conflicts: List[str]
-    post_apply: List[str]
+    depends: Tuple[str, ...]
+    conflicts: Tuple[str, ...]
+    post_apply: Tuple[str, ...]
     test: str | None
 
 
@@ -55,11 +57,18 @@ def _validate_paths(paths: List[str], *, field_name: str) -> List[str]:
 
 
 def read_manifest(skill_dir: Path) -> SkillManifest:
-    """Load and validate a skill manifest."""
+    """Load and validate a skill manifest, reusing the parse while the file is unchanged."""
     manifest_path = Path(skill_dir) / "manifest.yaml"
-    if not manifest_path.exists():
-        raise FileNotFoundError(f"manifest_not_found:{manifest_path}")
+    try:
+        st = os.stat(manifest_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"manifest_not_found:{manifest_path}") from None
+    return _read_manifest_cached(str(manifest_path), st.st_mtime_ns, st.st_size)
 
+
+@lru_cache(maxsize=128)
+def _read_manifest_cached(path_str: str, mtime_ns: int, size: int) -> SkillManifest:
+    manifest_path = Path(path_str)
     raw = yaml.safe_load(manifest_path.read_text(encoding="utf-8")) or {}
     if not isinstance(raw, dict):
         raise ValueError(f"invalid_manifest:{manifest_path}")
@@ -75,8 +84,8 @@ def read_manifest(skill_dir: Path) -> SkillManifest:
     if not isinstance(structured_raw, dict):
         raise ValueError("structured_must_be_mapping")
     structured = StructuredOps(
-        env_additions=_ensure_list(structured_raw.get("env_additions")),
-        python_dependencies=_ensure_list(structured_raw.get("python_dependencies")),
+        env_additions=tuple(_ensure_list(structured_raw.get("env_additions"))),
+        python_dependencies=tuple(_ensure_list(structured_raw.get("python_dependencies"))),
     )
 
     adds = _validate_paths(_ensure_list(raw.get("adds")), field_name="adds")
@@ -91,12 +100,12 @@ def read_manifest(skill_dir: Path) -> SkillManifest:
         version=version,
         description=description,
         core_version=core_version,
-        adds=adds,
-        modifies=modifies,
+        adds=tuple(adds),
+        modifies=tuple(modifies),
         structured=structured,
-        depends=depends,
-        conflicts=conflicts,
-        post_apply=post_apply,
+        depends=tuple(depends),
+        conflicts=tuple(conflicts),
+        post_apply=tuple(post_apply),
         test=test,
     )
 
@@ -2,10 +2,36 @@
 
 from __future__ import annotations
 
+import atexit
+import os
 import shutil
+import stat
 import subprocess
+import tempfile
+import threading
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+try:
+    import pygit2
+
+    _HAS_PYGIT2 = True
+except ImportError:  # pragma: no cover - optional dependency
+    pygit2 = None
+    _HAS_PYGIT2 = False
+
+# linux/fs.h FICLONE: share the source extents with the destination (reflink).
+_FICLONE = 0x40049409
+
+# One scratch repo per process; libgit2 repository handles are not shared across threads unlocked.
+_SCRATCH_LOCK = threading.Lock()
+_SCRATCH_REPO = None
 
 
 @dataclass(frozen=True)
@@ -17,20 +43,74 @@ class MergeResult:
     output: str
 
 
+def _scratch_repo():
+    """Process-wide bare repo for merge blobs, removed at exit; callers hold _SCRATCH_LOCK."""
+    global _SCRATCH_REPO
+    if _SCRATCH_REPO is None:
+        path = tempfile.mkdtemp(prefix="vfriday-merge-")
+        atexit.register(shutil.rmtree, path, True)
+        _SCRATCH_REPO = pygit2.init_repository(path, bare=True)
+    return _SCRATCH_REPO
+
+
+def _prune_blobs(repo, blob_ids) -> None:
+    """Unlink the loose objects a merge wrote so the scratch repo does not grow."""
+    objects = Path(repo.path) / "objects"
+    for blob_id in blob_ids:
+        hex_id = str(blob_id)
+        (objects / hex_id[:2] / hex_id[2:]).unlink(missing_ok=True)
+
+
+def _merge_in_process(current: Path, base: Path, theirs: Path) -> Optional[MergeResult]:
+    """Three-way merge through libgit2; None means fall back to git merge-file."""
+    paths = (base, current, theirs)
+    contents = [path.read_bytes() for path in paths]
+    if any(b"\0" in data for data in contents):
+        # pygit2 returns the merge as a C string; binary content goes to git.
+        return None
+    blob_ids = []
+    with _SCRATCH_LOCK:
+        try:
+            repo = _scratch_repo()
+            entries = []
+            for path, data in zip(paths, contents):
+                blob_ids.append(repo.create_blob(data))
+                entries.append(pygit2.IndexEntry(str(path), blob_ids[-1], pygit2.GIT_FILEMODE_BLOB))
+            result = repo.merge_file_from_index(*entries, use_deprecated=False)
+            output = result.contents
+            # pygit2 decodes strict UTF-8, so encoding restores the merged bytes exactly.
+            merged = output.encode("utf-8")
+        except (pygit2.GitError, UnicodeDecodeError, AttributeError, TypeError):
+            return None
+        finally:
+            if blob_ids:
+                _prune_blobs(repo, blob_ids)
+    if merged:
+        current.write_bytes(merged)
+    if result.automergeable:
+        return MergeResult(clean=True, conflicted=False, output=output)
+    return MergeResult(clean=False, conflicted=True, output=output)
+
+
 def merge_file(current: Path, base: Path, theirs: Path) -> MergeResult:
-    """Run git merge-file and write merged content to current file."""
+    """Three-way merge into current, in-process via pygit2 when available."""
+    if _HAS_PYGIT2:
+        result = _merge_in_process(current, base, theirs)
+        if result is not None:
+            return result
     cmd = ["git", "merge-file", "-p", str(current), str(base), str(theirs)]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    merged = proc.stdout or ""
+    proc = subprocess.run(cmd, capture_output=True)
+    # git exits with the number of conflicts (capped at 127); anything else is an error.
+    if not 0 <= proc.returncode <= 127:
+        err = proc.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"merge_file_failed:{err}")
+    merged = proc.stdout
     if merged:
-        current.write_text(merged, encoding="utf-8")
+        current.write_bytes(merged)
+    output = merged.decode("utf-8", errors="replace")
     if proc.returncode == 0:
-        return MergeResult(clean=True, conflicted=False, output=merged)
-    if proc.returncode == 1:
-        # 1 means conflicts were produced with markers.
-        return MergeResult(clean=False, conflicted=True, output=merged)
-    err = (proc.stderr or "").strip()
-    raise RuntimeError(f"merge_file_failed:{err}")
+        return MergeResult(clean=True, conflicted=False, output=output)
+    return MergeResult(clean=False, conflicted=True, output=output)
 
 
 def ensure_parent(path: Path) -> None:
@@ -38,6 +118,43 @@ def ensure_parent(path: Path) -> None:
 
 
 def copy_file(src: Path, dst: Path) -> None:
+    """Copy contents only; apply flows do not need copy2's chmod/utime round-trip."""
     ensure_parent(dst)
-    shutil.copy2(src, dst)
+    shutil.copyfile(src, dst)
+
+
+def _clone_fd(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Reflink, else in-kernel sendfile; False when neither is supported."""
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+            return True
+        except OSError:
+            pass
+    try:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
+def fast_clone(src: Path | str, dst: Path | str, st: Optional[os.stat_result] = None) -> None:
+    """Copy src to dst like copy2, without pulling the bytes through userspace.
 
+    Hard links are deliberately not used: a later edit to dst would also
+    rewrite the skill package or base snapshot it was linked from.
+    """
+    if st is None:
+        st = os.stat(src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        cloned = _clone_fd(fsrc.fileno(), fdst.fileno(), st.st_size)
+    if not cloned:
+        shutil.copy2(src, dst)
+        return
+    os.chmod(dst, stat.S_IMODE(st.st_mode))
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
@@ -3,17 +3,62 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import shutil
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Set, Tuple
 
 import yaml
 
+from vfriday import json_codec
+from vfriday.skills_engine.merge import fast_clone
+
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 SKILLS_SYSTEM_VERSION = "0.1.0"
+_HASH_BLOCK_SIZE = 1 << 20
+# Directory names never copied into the base snapshot, at any depth.
+_EXCLUDED_DIRS = frozenset({".git", ".pytest_cache", ".mypy_cache", "__pycache__", ".vfriday", "data"})
+
+# Absolute path -> (st_mtime_ns, st_size, sha256). An entry is reused only while
+# the file's mtime and size still match, so edits invalidate it.
+_HASH_CACHE: Dict[str, Tuple[int, int, str]] = {}
+_HASH_CACHE_LOADED: Set[str] = set()
+# Paths whose entry changed since the cache file was last written.
+_HASH_CACHE_DIRTY: Set[str] = set()
+
+
+@dataclass(frozen=True)
+class ResolvedRoot:
+    """Project root that has already been through Path.resolve()."""
+
+    path: Path
+
+    def __fspath__(self) -> str:
+        return str(self.path)
+
+
+def resolve_root(project_root: Path) -> ResolvedRoot:
+    """Resolve once at an entry point; helpers given the result skip the realpath walk."""
+    if isinstance(project_root, ResolvedRoot):
+        return project_root
+    return ResolvedRoot(Path(project_root).resolve())
+
+
+def _root(project_root: Path) -> Path:
+    if isinstance(project_root, ResolvedRoot):
+        return project_root.path
+    return Path(project_root).resolve()
 
 
 def _vfriday_dir(project_root: Path) -> Path:
-    return Path(project_root).resolve() / ".vfriday"
+    return _root(project_root) / ".vfriday"
 
 
 def state_path(project_root: Path) -> Path:
@@ -28,46 +73,50 @@ def backup_dir(project_root: Path) -> Path:
     return _vfriday_dir(project_root) / "backup"
 
 
+def hash_cache_path(project_root: Path) -> Path:
+    return _vfriday_dir(project_root) / "hash_cache.json"
+
+
 def _core_version(project_root: Path) -> str:
-    p = Path(project_root).resolve() / "VERSION"
+    p = _root(project_root) / "VERSION"
     return p.read_text(encoding="utf-8").strip() if p.exists() else "0.0.0"
 
 
 def _snapshot_base(project_root: Path, dst_base: Path) -> None:
-    root = Path(project_root).resolve()
+    root = _root(project_root)
     if dst_base.exists():
         shutil.rmtree(dst_base)
     dst_base.mkdir(parents=True, exist_ok=True)
 
-    excluded = {
-        ".git",
-        ".pytest_cache",
-        ".mypy_cache",
-        "__pycache__",
-        ".vfriday",
-        "data",
-    }
-    for src in root.rglob("*"):
-        if src.is_dir():
-            continue
-        rel = src.relative_to(root)
-        if any(part in excluded for part in rel.parts):
-            continue
-        dst = dst_base / rel
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+    # Each stack entry carries its destination directory, so no per-file relpath is needed.
+    made_dirs = {str(dst_base)}
+    stack = [(str(root), str(dst_base))]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Prune excluded trees here so they are never walked.
+                    if entry.name not in _EXCLUDED_DIRS:
+                        stack.append((entry.path, dst_dir + os.sep + entry.name))
+                    continue
+                if not entry.is_file():
+                    continue
+                if dst_dir not in made_dirs:
+                    os.makedirs(dst_dir, exist_ok=True)
+                    made_dirs.add(dst_dir)
+                fast_clone(entry.path, dst_dir + os.sep + entry.name, entry.stat())
 
 
 def init_skills_state(project_root: Path, *, force: bool = False) -> Dict[str, Any]:
     """Initialize `.vfriday/state.yaml` and base snapshot."""
-    root = Path(project_root).resolve()
-    vf = _vfriday_dir(root)
-    vf.mkdir(parents=True, exist_ok=True)
+    root = resolve_root(project_root)
     sp = state_path(root)
-    bd = base_dir(root)
     if sp.exists() and not force:
         return load_state(root)
 
+    _vfriday_dir(root).mkdir(parents=True, exist_ok=True)
+    bd = base_dir(root)
     state: Dict[str, Any] = {
         "skills_system_version": SKILLS_SYSTEM_VERSION,
         "core_version": _core_version(root),
@@ -81,31 +130,88 @@ def init_skills_state(project_root: Path, *, force: bool = False) -> Dict[str, A
 
 def load_state(project_root: Path) -> Dict[str, Any]:
     """Load state file, initializing if missing."""
-    root = Path(project_root).resolve()
+    root = resolve_root(project_root)
     sp = state_path(root)
     if not sp.exists():
         return init_skills_state(root)
-    state = yaml.safe_load(sp.read_text(encoding="utf-8")) or {}
+    state = yaml.load(sp.read_bytes(), Loader=_YamlLoader) or {}
     if not isinstance(state, dict):
         raise ValueError(f"invalid_state:{sp}")
+    _load_hash_cache(root.path)
     return state
 
 
 def write_state(project_root: Path, state: Dict[str, Any]) -> None:
     """Persist state deterministically."""
-    root = Path(project_root).resolve()
-    sp = state_path(root)
+    sp = state_path(project_root)
     sp.parent.mkdir(parents=True, exist_ok=True)
-    sp.write_text(yaml.safe_dump(state, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    sp.write_bytes(yaml.dump(state, Dumper=_YamlDumper, sort_keys=False, allow_unicode=True, encoding="utf-8"))
+
+
+def _load_hash_cache(root: Path) -> None:
+    """Merge the persisted hash cache for ``root`` into memory, once per process."""
+    key = str(root)
+    if key in _HASH_CACHE_LOADED:
+        return
+    _HASH_CACHE_LOADED.add(key)
+    cp = hash_cache_path(root)
+    if not cp.exists():
+        return
+    try:
+        raw = json_codec.loads(cp.read_bytes())
+    except ValueError:
+        return
+    if not isinstance(raw, dict):
+        return
+    for rel, entry in raw.items():
+        if isinstance(entry, list) and len(entry) == 3:
+            _HASH_CACHE.setdefault(os.path.join(key, rel), (int(entry[0]), int(entry[1]), str(entry[2])))
+
+
+def _save_hash_cache(root: Path) -> None:
+    """Persist ``root``'s hash cache entries, only if one changed since the last save."""
+    prefix = str(root) + os.sep
+    dirty = {path for path in _HASH_CACHE_DIRTY if path.startswith(prefix)}
+    if not dirty:
+        return
+    _HASH_CACHE_DIRTY.difference_update(dirty)
+    entries = {
+        path[len(prefix):]: list(entry)
+        for path, entry in _HASH_CACHE.items()
+        if path.startswith(prefix)
+    }
+    cp = hash_cache_path(root)
+    cp.parent.mkdir(parents=True, exist_ok=True)
+    cp.write_bytes(json_codec.dumps_bytes(entries, sort_keys=True))
 
 
 def compute_file_hash(path: Path) -> str:
-    """SHA-256 hash for drift and replay checks."""
-    h = hashlib.sha256()
-    with Path(path).open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 64), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    """SHA-256 hash for drift and replay checks, memoized by (path, mtime, size)."""
+    abspath = os.path.abspath(path)
+    st = os.stat(abspath)
+    cached = _HASH_CACHE.get(abspath)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = _hash_file(abspath)
+    _HASH_CACHE[abspath] = (st.st_mtime_ns, st.st_size, digest)
+    _HASH_CACHE_DIRTY.add(abspath)
+    return digest
+
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Python < 3.11: reuse one buffer instead of allocating a bytes object per chunk.
+        h = hashlib.sha256()
+        buf = bytearray(_HASH_BLOCK_SIZE)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+        return h.hexdigest()
 
 
 def record_skill_application(
@@ -117,18 +223,24 @@ def record_skill_application(
     structured_outcomes: Dict[str, Any] | None = None,
 ) -> Dict[str, Any]:
     """Append a skill application record to state."""
-    state = load_state(project_root)
+    root = resolve_root(project_root)
+    state = load_state(root)
+    record = {
+        "name": skill_name,
+        "version": version,
+        "file_hashes": file_hashes,
+        "structured_outcomes": structured_outcomes or {},
+    }
     applied: List[Dict[str, Any]] = list(state.get("applied_skills") or [])
+    # Re-applying with identical results is a no-op only if the record is already last,
+    # since re-application otherwise moves the skill to the end of the list.
+    if applied and json_codec.dumps_bytes(applied[-1], sort_keys=True) == json_codec.dumps_bytes(record, sort_keys=True):
+        _save_hash_cache(root.path)
+        return state
     applied = [x for x in applied if str(x.get("name")) != skill_name]
-    applied.append(
-        {
-            "name": skill_name,
-            "version": version,
-            "file_hashes": file_hashes,
-            "structured_outcomes": structured_outcomes or {},
-        }
-    )
+    applied.append(record)
     state["applied_skills"] = applied
-    write_state(project_root, state)
+    write_state(root, state)
+    _save_hash_cache(root.path)
     return state
 
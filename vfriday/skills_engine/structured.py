@@ -2,57 +2,59 @@
 
 from __future__ import annotations
 
+import re
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Optional, Set
 
+from vfriday.skills_engine.state import resolve_root
 
-def merge_env_additions(env_example_path: Path, additions: Iterable[str]) -> List[str]:
-    """Ensure env keys exist as KEY= lines."""
-    p = Path(env_example_path)
-    if p.exists():
-        lines = p.read_text(encoding="utf-8").splitlines()
-    else:
-        lines = []
-
-    existing_keys = set()
-    for line in lines:
-        striped = line.strip()
-        if not striped or striped.startswith("#") or "=" not in striped:
-            continue
-        existing_keys.add(striped.split("=", 1)[0].strip())
-
-    appended: List[str] = []
+# Non-comment lines: the env key is the text before the first "=", a requirement is the whole line.
+_ENV_KEY_RE = re.compile(r"^[^\S\n]*([^#\s=][^=\n]*)=", re.MULTILINE)
+_REQUIREMENT_RE = re.compile(r"^[^\S\n]*([^#\s][^\n]*?)\s*$", re.MULTILINE)
+
+
+def _new_entries(additions: Iterable[str], existing: Set[str]) -> List[str]:
+    """Stripped additions not already present, first occurrence wins."""
+    fresh: List[str] = []
     for raw in additions:
-        key = str(raw).strip()
-        if not key or key in existing_keys:
-            continue
-        lines.append(f"{key}=")
-        appended.append(key)
-        existing_keys.add(key)
+        item = str(raw).strip()
+        if item and item not in existing:
+            fresh.append(item)
+            existing.add(item)
+    return fresh
+
+
+def _read_lines(p: Path) -> Optional[List[str]]:
+    """File lines, or None when the file does not exist yet."""
+    return p.read_text(encoding="utf-8").splitlines() if p.exists() else None
+
 
+def _rewrite(p: Path, lines: Optional[List[str]], new_lines: List[str]) -> None:
+    # Leave an existing file untouched on a no-op so its mtime (and hash-cache entry) survive.
+    if lines is not None and not new_lines:
+        return
     p.parent.mkdir(parents=True, exist_ok=True)
-    text = "\n".join(lines).rstrip() + "\n"
-    p.write_text(text, encoding="utf-8")
+    p.write_text("\n".join([*(lines or []), *new_lines]).rstrip() + "\n", encoding="utf-8")
+
+
+def merge_env_additions(env_example_path: Path, additions: Iterable[str]) -> List[str]:
+    """Ensure env keys exist as KEY= lines."""
+    p = Path(env_example_path)
+    lines = _read_lines(p)
+    # Scan the splitlines-normalized text so line boundaries match the rewrite.
+    existing_keys = {m.group(1).strip() for m in _ENV_KEY_RE.finditer("\n".join(lines or []))}
+    appended = _new_entries(additions, existing_keys)
+    _rewrite(p, lines, [f"{key}=" for key in appended])
     return appended
 
 
 def merge_python_dependencies(requirements_path: Path, additions: Iterable[str]) -> List[str]:
     """Append missing dependencies to requirements.txt preserving order."""
     p = Path(requirements_path)
-    existing_lines = p.read_text(encoding="utf-8").splitlines() if p.exists() else []
-    existing = {line.strip() for line in existing_lines if line.strip() and not line.strip().startswith("#")}
-
-    appended: List[str] = []
-    for dep in additions:
-        d = str(dep).strip()
-        if not d or d in existing:
-            continue
-        existing_lines.append(d)
-        appended.append(d)
-        existing.add(d)
-
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(("\n".join(existing_lines).rstrip() + "\n"), encoding="utf-8")
+    lines = _read_lines(p)
+    existing = {m.group(1) for m in _REQUIREMENT_RE.finditer("\n".join(lines or []))}
+    appended = _new_entries(additions, existing)
+    _rewrite(p, lines, appended)
     return appended
 
 
@@ -63,7 +65,7 @@ def apply_structured_ops(
     python_dependencies: Iterable[str],
 ) -> Dict[str, list]:
     """Apply all structured operations and return exact outcomes."""
-    root = Path(project_root).resolve()
+    root = resolve_root(project_root).path
     env_added = merge_env_additions(root / ".env.example", env_additions)
     deps_added = merge_python_dependencies(root / "requirements.txt", python_dependencies)
     return {
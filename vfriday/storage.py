@@ -2,14 +2,75 @@
 
 from __future__ import annotations
 
-import json
+import base64
+import logging
+import queue
 import sqlite3
 import threading
+import time
 import uuid
-from contextlib import contextmanager
+import weakref
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from vfriday import blob_codec, json_codec
+from vfriday.storage_audit import AuditLog, encode_record
+from vfriday.storage_schema import (
+    BUDGET_ENTRY_SQL,
+    BUDGET_TOTALS_SQL,
+    MONTH_SPENT_SQL,
+    RETENTION_SQL,
+    SESSION_COLS,
+    SOLVER_RUN_SQL,
+    TUTOR_TURN_SQL,
+    VERIFIER_RUN_SQL,
+    init_schema,
+    iso_from_us,
+    strip_legacy_page,
+    us_from_datetime,
+)
+
+log = logging.getLogger(__name__)
+
+# One queued statement: ``(sql, params, audit_line)``.
+_WriteItem = Tuple[str, tuple, Optional[bytes]]
+
+# Queued rows grouped into one background commit; a unit is never split, so a batch may exceed it.
+_WRITE_BATCH_MAX = 100
+# In-memory budget totals are re-read from SQL at least this often.
+_BUDGET_REFRESH_SECONDS = 60.0
+# Events rewritten per retention transaction.
+_RETENTION_PAGE_ROWS = 10_000
+# BEGIN IMMEDIATE retries after busy_timeout expires; the delay doubles each time.
+_LOCK_RETRIES = 6
+_LOCK_BACKOFF_SECONDS = 0.01
+# Per-connection settings; journal_mode=WAL is persistent and set once in _init_db.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _stop_writers(lanes: List[queue.Queue], writers: List[threading.Thread]) -> None:
+    """Let writers drain their lanes and exit.
+
+    Also the exit-time finalizer for a Storage never closed; writers log their
+    own failures, so nothing is raised during interpreter shutdown.
+    """
+    for lane in lanes:
+        lane.put(None)
+    for worker in writers:
+        worker.join()
+
+
+class _Connection(sqlite3.Connection):
+    """Plain connection subclass; unlike the base type it supports weak references."""
 
 
 def _utc_now() -> datetime:
@@ -20,134 +81,343 @@ def _utc_now_iso() -> str:
     return _utc_now().isoformat()
 
 
+def _utc_now_us() -> int:
+    """Row timestamps: integer microseconds since the Unix epoch, UTC."""
+    return time.time_ns() // 1000
+
+
 class Storage:
     """Persistence layer for sessions, pipeline runs, governance snapshots, and budget."""
 
-    def __init__(self, db_path: Path, audit_jsonl_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        audit_jsonl_path: Path,
+        *,
+        async_writes: bool = False,
+        writer_lanes: int = 2,
+    ):
         self.db_path = Path(db_path).resolve()
         self.audit_jsonl_path = Path(audit_jsonl_path).resolve()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.audit_jsonl_path.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self._tx = threading.local()
+        self._tls = threading.local()
+        self._connections: "weakref.WeakSet[_Connection]" = weakref.WeakSet()
+        self._audit = AuditLog(self.audit_jsonl_path)
+        self._budget_lock = threading.Lock()
+        self._budget_month: Optional[Tuple[int, int]] = None
+        self._budget_month_start = 0
+        self._budget_refreshed_at = 0.0
+        self._month_spent = 0.0
+        self._session_spent: Dict[str, float] = {}
         self._init_db()
+        self._lanes: List[queue.Queue] = []
+        self._writers: List[threading.Thread] = []
+        # Failures from background writers, re-raised to the next flush() or close().
+        self._writer_errors: List[BaseException] = []
+        self._writer_errors_lock = threading.Lock()
+        self._finalizer: Optional[weakref.finalize] = None
+        if async_writes:
+            self._start_writers(max(1, int(writer_lanes)))
+
+    def _open(self) -> _Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, factory=_Connection)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _thread_conn(self) -> _Connection:
+        """This thread's long-lived connection, opened and configured on first use."""
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._tls.conn = conn
+            self._connections.add(conn)
+        return conn
 
     @contextmanager
     def _conn(self) -> Iterable[sqlite3.Connection]:
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        tx_conn = getattr(self._tx, "conn", None)
+        if tx_conn is not None:
+            # Inside transaction(): share its connection and leave commit to it.
+            yield tx_conn
+            return
+        conn = self._thread_conn()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    @contextmanager
+    def _write_conn(self) -> Iterator[sqlite3.Connection]:
+        # Standalone writes take the write lock up front, like transaction(), so
+        # contention surfaces at BEGIN where it can be retried.
+        with self.transaction() as conn:
+            yield conn
+
+    @staticmethod
+    def _begin_immediate(conn: sqlite3.Connection) -> None:
+        """BEGIN IMMEDIATE, backing off while another writer holds the lock past busy_timeout."""
+        delay = _LOCK_BACKOFF_SECONDS
+        for attempt in range(_LOCK_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as exc:
+                message = str(exc).lower()
+                if attempt == _LOCK_RETRIES or ("locked" not in message and "busy" not in message):
+                    raise
+                log.debug("SQLite write lock busy; retrying in %.3fs", delay)
+                time.sleep(delay)
+                delay *= 2
+
+    def _in_transaction(self) -> bool:
+        return getattr(self._tx, "conn", None) is not None
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group every write issued on this thread into one IMMEDIATE transaction.
+
+        Re-entrant: nested calls join the outer transaction. Audit lines for
+        events written inside are appended only after the commit succeeds, and
+        budget totals move in the same step as the commit. Queued writes are
+        not waited for; call flush() first when their order matters.
+        """
+        if self._in_transaction():
+            yield self._tx.conn
+            return
+        conn = self._thread_conn()
+        self._begin_immediate(conn)
+        self._tx.conn = conn
+        self._tx.audits = []
+        self._tx.spend = []
         try:
             yield conn
-            conn.commit()
+            if self._tx.spend:
+                # A reseed reads SQL under the same lock, so it sees either the
+                # committed rows or the increment, never both.
+                with self._budget_lock:
+                    conn.commit()
+                    self._count_spend(self._tx.spend)
+            else:
+                conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
         finally:
-            conn.close()
+            self._tx.conn = None
+            self._tx.spend = []
+            audits, self._tx.audits = self._tx.audits, []
+        if audits:
+            self._write_audit_lines(audits)
 
-    def _init_db(self) -> None:
-        ddl = """
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            student_alias TEXT NOT NULL,
-            topic TEXT,
-            grade_level TEXT,
-            goal TEXT,
-            active_setpoints_json TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS chat_sessions (
-            chat_id INTEGER PRIMARY KEY,
-            session_id TEXT NOT NULL,
-            updated_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trace_id TEXT NOT NULL,
-            session_id TEXT NOT NULL,
-            event_type TEXT NOT NULL,
-            payload_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS solver_runs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trace_id TEXT NOT NULL,
-            session_id TEXT NOT NULL,
-            model TEXT NOT NULL,
-            status TEXT NOT NULL,
-            latency_ms INTEGER NOT NULL,
-            usage_json TEXT NOT NULL,
-            response_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS verifier_runs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trace_id TEXT NOT NULL,
-            session_id TEXT NOT NULL,
-            checked_claims INTEGER NOT NULL,
-            passed_claims INTEGER NOT NULL,
-            failed_claims INTEGER NOT NULL,
-            disagreement_rate REAL NOT NULL,
-            response_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS tutor_turns (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trace_id TEXT NOT NULL,
-            session_id TEXT NOT NULL,
-            model TEXT NOT NULL,
-            tutor_message TEXT NOT NULL,
-            confidence REAL NOT NULL,
-            requires_attempt INTEGER NOT NULL,
-            flags_json TEXT NOT NULL,
-            hidden_score REAL NOT NULL,
-            leakage_penalty REAL NOT NULL,
-            usage_json TEXT NOT NULL,
-            latency_ms INTEGER NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS setpoint_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            snapshot_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS stress_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            stress_ai REAL NOT NULL,
-            stress_viktor REAL NOT NULL,
-            factors_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS benchmark_runs (
-            report_id TEXT PRIMARY KEY,
-            candidate_models_json TEXT NOT NULL,
-            sample_size INTEGER NOT NULL,
-            summary_json TEXT NOT NULL,
-            recommendation TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS budget_ledger (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            trace_id TEXT NOT NULL,
-            session_id TEXT,
-            category TEXT NOT NULL,
-            model TEXT,
-            amount_usd REAL NOT NULL,
-            metadata_json TEXT NOT NULL,
-            created_at TEXT NOT NULL
-        );
+    @contextmanager
+    def write_group(self, session_id: Optional[str]) -> Iterator[None]:
+        """Commit every write issued on this thread inside the block as one unit.
+
+        With writer lanes the unit is queued on the session's lane and committed
+        in the background, so the caller never waits on SQLite; without them, or
+        inside transaction(), it is written synchronously. Nothing is written if
+        the block raises.
         """
-        with self._conn() as conn:
-            conn.executescript(ddl)
+        if getattr(self._tx, "group", None) is not None:
+            yield
+            return
+        if not self._lanes or self._in_transaction():
+            with self.transaction():
+                yield
+            return
+        self._tx.group = []
+        try:
+            yield
+            group = self._tx.group
+        finally:
+            self._tx.group = None
+        if group:
+            self._lane_for(session_id).put(group)
+
+    def _init_db(self) -> None:
+        # DDL runs on its own short-lived connection, never on a per-thread one.
+        with closing(self._open()) as conn:
+            init_schema(conn, self.db_path)
 
     @staticmethod
     def _json(data: Dict[str, Any]) -> str:
-        return json.dumps(data, ensure_ascii=False, sort_keys=True)
+        return json_codec.dumps_sorted(data)
+
+    # ── Background writer ───────────────────────────────────────────
+
+    def _start_writers(self, lanes: int) -> None:
+        for idx in range(lanes):
+            lane: queue.Queue = queue.Queue()
+            worker = threading.Thread(
+                target=self._writer_loop,
+                args=(lane,),
+                name=f"vfriday-storage-writer-{idx}",
+                daemon=True,
+            )
+            self._lanes.append(lane)
+            self._writers.append(worker)
+            worker.start()
+        # Holds the lanes, not the Storage, so closed instances can be collected.
+        self._finalizer = weakref.finalize(self, _stop_writers, self._lanes, self._writers)
+
+    def _lane_for(self, session_id: Optional[str]) -> queue.Queue:
+        # One lane per session keeps that session's writes strictly ordered.
+        return self._lanes[hash(session_id or "") % len(self._lanes)]
+
+    def _writer_loop(self, lane: queue.Queue) -> None:
+        # Lane entries are units: lists of items that commit together.
+        while True:
+            units = [lane.get()]
+            rows = len(units[0] or ())
+            while rows < _WRITE_BATCH_MAX:
+                try:
+                    unit = lane.get_nowait()
+                except queue.Empty:
+                    break
+                units.append(unit)
+                rows += len(unit or ())
+            stop = any(unit is None for unit in units)
+            try:
+                self._write_units([unit for unit in units if unit is not None])
+            finally:
+                for _ in units:
+                    lane.task_done()
+            if stop:
+                return
+
+    def _write_units(self, units: List[List[_WriteItem]]) -> None:
+        """Write queued units under one commit; if it fails, retry unit by unit so a bad unit loses only itself."""
+        try:
+            self._write_batch([item for unit in units for item in unit])
+            return
+        except Exception as exc:
+            if len(units) == 1:
+                self._record_writer_error(exc)
+                return
+        for unit in units:
+            try:
+                self._write_batch(unit)
+            except Exception as exc:
+                self._record_writer_error(exc)
+
+    def _record_writer_error(self, exc: BaseException) -> None:
+        log.warning("Storage writer failed to persist a queued write", exc_info=exc)
+        with self._writer_errors_lock:
+            self._writer_errors.append(exc)
+
+    def _raise_writer_errors(self) -> None:
+        with self._writer_errors_lock:
+            errors, self._writer_errors = self._writer_errors, []
+        if errors:
+            if len(errors) > 1:
+                log.warning("%d further storage writer failure(s) were logged above", len(errors) - 1)
+            raise errors[0]
+
+    def _write_batch(self, batch: Sequence[_WriteItem]) -> None:
+        """Persist writes under one commit; audit lines follow the commit.
+
+        Items are grouped by statement so each table gets one executemany;
+        submission order is kept within every table.
+        """
+        if not batch:
+            return
+        grouped: Dict[str, List[tuple]] = {}
+        for sql, params, _audit in batch:
+            grouped.setdefault(sql, []).append(params)
+        with self.transaction() as conn:
+            for sql, rows in grouped.items():
+                if len(rows) == 1:
+                    conn.execute(sql, rows[0])
+                else:
+                    conn.executemany(sql, rows)
+                if sql == BUDGET_ENTRY_SQL:
+                    self._tx.spend.extend((params[1], params[4]) for params in rows)
+            self._tx.audits.extend(audit for _sql, _params, audit in batch if audit is not None)
+
+    def _submit(
+        self,
+        session_id: Optional[str],
+        sql: str,
+        params: tuple,
+        audit: Optional[bytes] = None,
+    ) -> None:
+        item = (sql, params, audit)
+        group = getattr(self._tx, "group", None)
+        if group is not None:
+            group.append(item)
+        elif self._lanes and not self._in_transaction():
+            self._lane_for(session_id).put([item])
+        else:
+            # Inside transaction() writes stay on the caller's connection so they commit or roll back with it.
+            self._write_batch([item])
+
+    def _submit_many(self, sql: str, rows: Sequence[Tuple[Optional[str], tuple]]) -> None:
+        """Submit ``(session_id, params)`` rows for one statement.
+
+        Without writer lanes, or inside transaction(), this is one executemany on
+        the caller's connection; inside write_group() the rows join the group.
+        """
+        if not rows:
+            return
+        group = getattr(self._tx, "group", None)
+        if group is not None:
+            group.extend((sql, params, None) for _session_id, params in rows)
+        elif not self._lanes or self._in_transaction():
+            self._write_batch([(sql, params, None) for _session_id, params in rows])
+        else:
+            for session_id, params in rows:
+                self._lane_for(session_id).put([(sql, params, None)])
+
+    def _drain(self, session_id: Optional[str] = None) -> None:
+        if not self._lanes:
+            return
+        lanes = [self._lane_for(session_id)] if session_id is not None else self._lanes
+        for lane in lanes:
+            lane.join()
+
+    def flush(self, session_id: Optional[str] = None) -> None:
+        """Block until queued writes (for one session, or all) are committed.
+
+        Re-raises the first background write failure since the last call. Inside
+        transaction() this does not wait: a writer needs the lock this thread
+        holds, so waiting on it would deadlock.
+        """
+        if not self._in_transaction():
+            self._drain(session_id)
+        self._raise_writer_errors()
 
-    @staticmethod
-    def _as_dict(row: sqlite3.Row | None) -> Optional[Dict[str, Any]]:
-        if row is None:
-            return None
-        return {k: row[k] for k in row.keys()}
+    def close(self) -> None:
+        """Drain and stop background writers, then close every thread's connection.
+
+        Re-raises the first background write failure not yet seen by flush().
+        """
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        lanes, self._lanes = self._lanes, []
+        writers, self._writers = self._writers, []
+        _stop_writers(lanes, writers)
+        self._close_handles()
+        self._raise_writer_errors()
+
+    def _close_handles(self) -> None:
+        for conn in list(self._connections):
+            conn.close()
+        self._connections.clear()
+        self._tls = threading.local()
+        self._audit.close()
+
+    def _write_audit_lines(self, lines: Sequence[bytes]) -> None:
+        self._audit.write(lines)
+
+    def flush_audit(self) -> None:
+        """Force pending audit records to disk now instead of at the next coalesced sync."""
+        self._audit.flush()
 
     def append_audit(
         self,
@@ -155,18 +425,20 @@ class Storage:
         trace_id: str,
         session_id: str,
         event_type: str,
-        payload: Dict[str, Any],
+        payload: Optional[Dict[str, Any]] = None,
+        payload_json: Optional[str] = None,
     ) -> None:
-        line = {
-            "ts": _utc_now_iso(),
-            "trace_id": trace_id,
-            "session_id": session_id,
-            "event_type": event_type,
-            "payload": payload,
-        }
-        with self._lock:
-            with self.audit_jsonl_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        """Append one audit record; pass ``payload_json`` when the payload is already encoded."""
+        if payload is None and payload_json is None:
+            raise ValueError("append_audit needs payload or payload_json")
+        line = encode_record(
+            trace_id=trace_id,
+            session_id=session_id,
+            event_type=event_type,
+            payload=payload,
+            payload_json=payload_json,
+        )
+        self._write_audit_lines([line])
 
     def create_session(
         self,
@@ -179,7 +451,7 @@ class Storage:
     ) -> Dict[str, Any]:
         session_id = uuid.uuid4().hex[:12]
         now = _utc_now_iso()
-        with self._conn() as conn:
+        with self._write_conn() as conn:
             conn.execute(
                 """
                 INSERT INTO sessions (
@@ -205,30 +477,31 @@ class Storage:
         }
 
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self.flush(session_id)
         with self._conn() as conn:
             row = conn.execute(
-                "SELECT * FROM sessions WHERE session_id = ?",
+                f"SELECT {', '.join(SESSION_COLS)} FROM sessions WHERE session_id = ?",
                 (session_id,),
             ).fetchone()
-        out = self._as_dict(row)
-        if not out:
+        if row is None:
             return None
-        out["active_setpoints"] = json.loads(out.pop("active_setpoints_json"))
+        out = dict(zip(SESSION_COLS, row))
+        out["active_setpoints"] = json_codec.loads(out.pop("active_setpoints_json"))
         return out
 
     def update_session_setpoints(self, session_id: str, setpoints: Dict[str, float]) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                UPDATE sessions
-                SET active_setpoints_json = ?, updated_at = ?
-                WHERE session_id = ?
-                """,
-                (self._json(setpoints), _utc_now_iso(), session_id),
-            )
+        self._submit(
+            session_id,
+            """
+            UPDATE sessions
+            SET active_setpoints_json = ?, updated_at = ?
+            WHERE session_id = ?
+            """,
+            (self._json(setpoints), _utc_now_iso(), session_id),
+        )
 
     def bind_chat_session(self, chat_id: int, session_id: str) -> None:
-        with self._conn() as conn:
+        with self._write_conn() as conn:
             conn.execute(
                 """
                 INSERT INTO chat_sessions (chat_id, session_id, updated_at)
@@ -246,23 +519,32 @@ class Storage:
                 "SELECT session_id FROM chat_sessions WHERE chat_id = ?",
                 (int(chat_id),),
             ).fetchone()
-        return str(row["session_id"]) if row else None
+        return str(row[0]) if row else None
 
     def save_event(self, trace_id: str, session_id: str, event_type: str, payload: Dict[str, Any]) -> None:
-        payload_json = self._json(payload)
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO events (trace_id, session_id, event_type, payload_json, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (trace_id, session_id, event_type, payload_json, _utc_now_iso()),
-            )
-        self.append_audit(
-            trace_id=trace_id,
-            session_id=session_id,
-            event_type=event_type,
-            payload=payload,
+        """Persist one event; a base64 ``image_base64`` is stored as a compressed blob column.
+
+        The audit record always carries the full payload, image included.
+        """
+        stored, blob, codec = blob_codec.split_image(payload)
+        payload_json = self._json(stored)
+        self._submit(
+            session_id,
+            """
+            INSERT INTO events (
+                trace_id, session_id, event_type, payload_json, created_at,
+                payload_blob, payload_blob_codec
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (trace_id, session_id, event_type, payload_json, _utc_now_us(), blob, codec),
+            audit=encode_record(
+                trace_id=trace_id,
+                session_id=session_id,
+                event_type=event_type,
+                payload=payload,
+                # The stored JSON lacks the image, so it can only be spliced when nothing was split off.
+                payload_json=payload_json if blob is None else None,
+            ),
         )
 
     def save_solver_run(
@@ -275,25 +557,39 @@ class Storage:
         usage: Dict[str, Any],
         response: Dict[str, Any],
     ) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO solver_runs (
-                    trace_id, session_id, model, status, latency_ms,
-                    usage_json, response_json, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        row = {
+            "trace_id": trace_id,
+            "session_id": session_id,
+            "model": model,
+            "status": status,
+            "latency_ms": latency_ms,
+            "usage": usage,
+            "response": response,
+        }
+        self.save_solver_runs([row])
+
+    def save_solver_runs(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Insert many solver runs; keys match ``save_solver_run``'s arguments."""
+        now = _utc_now_us()
+        self._submit_many(
+            SOLVER_RUN_SQL,
+            [
                 (
-                    trace_id,
-                    session_id,
-                    model,
-                    status,
-                    int(latency_ms),
-                    self._json(usage),
-                    self._json(response),
-                    _utc_now_iso(),
-                ),
-            )
+                    row["session_id"],
+                    (
+                        row["trace_id"],
+                        row["session_id"],
+                        row["model"],
+                        row["status"],
+                        int(row["latency_ms"]),
+                        self._json(row["usage"]),
+                        self._json(row["response"]),
+                        now,
+                    ),
+                )
+                for row in rows
+            ],
+        )
 
     def save_verifier_run(
         self,
@@ -305,25 +601,39 @@ class Storage:
         disagreement_rate: float,
         response: Dict[str, Any],
     ) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO verifier_runs (
-                    trace_id, session_id, checked_claims, passed_claims,
-                    failed_claims, disagreement_rate, response_json, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        row = {
+            "trace_id": trace_id,
+            "session_id": session_id,
+            "checked_claims": checked_claims,
+            "passed_claims": passed_claims,
+            "failed_claims": failed_claims,
+            "disagreement_rate": disagreement_rate,
+            "response": response,
+        }
+        self.save_verifier_runs([row])
+
+    def save_verifier_runs(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Insert many verifier runs; keys match ``save_verifier_run``'s arguments."""
+        now = _utc_now_us()
+        self._submit_many(
+            VERIFIER_RUN_SQL,
+            [
                 (
-                    trace_id,
-                    session_id,
-                    int(checked_claims),
-                    int(passed_claims),
-                    int(failed_claims),
-                    float(disagreement_rate),
-                    self._json(response),
-                    _utc_now_iso(),
-                ),
-            )
+                    row["session_id"],
+                    (
+                        row["trace_id"],
+                        row["session_id"],
+                        int(row["checked_claims"]),
+                        int(row["passed_claims"]),
+                        int(row["failed_claims"]),
+                        float(row["disagreement_rate"]),
+                        self._json(row["response"]),
+                        now,
+                    ),
+                )
+                for row in rows
+            ],
+        )
 
     def save_tutor_turn(
         self,
@@ -339,40 +649,57 @@ class Storage:
         usage: Dict[str, Any],
         latency_ms: int,
     ) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO tutor_turns (
-                    trace_id, session_id, model, tutor_message, confidence,
-                    requires_attempt, flags_json, hidden_score, leakage_penalty,
-                    usage_json, latency_ms, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        row = {
+            "trace_id": trace_id,
+            "session_id": session_id,
+            "model": model,
+            "tutor_message": tutor_message,
+            "confidence": confidence,
+            "requires_attempt": requires_attempt,
+            "flags": flags,
+            "hidden_score": hidden_score,
+            "leakage_penalty": leakage_penalty,
+            "usage": usage,
+            "latency_ms": latency_ms,
+        }
+        self.save_tutor_turns([row])
+
+    def save_tutor_turns(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Insert many tutor turns; keys match ``save_tutor_turn``'s arguments."""
+        now = _utc_now_us()
+        self._submit_many(
+            TUTOR_TURN_SQL,
+            [
                 (
-                    trace_id,
-                    session_id,
-                    model,
-                    tutor_message,
-                    float(confidence),
-                    1 if requires_attempt else 0,
-                    self._json({"flags": flags}),
-                    float(hidden_score),
-                    float(leakage_penalty),
-                    self._json(usage),
-                    int(latency_ms),
-                    _utc_now_iso(),
-                ),
-            )
+                    row["session_id"],
+                    (
+                        row["trace_id"],
+                        row["session_id"],
+                        row["model"],
+                        row["tutor_message"],
+                        float(row["confidence"]),
+                        1 if row["requires_attempt"] else 0,
+                        self._json({"flags": row["flags"]}),
+                        float(row["hidden_score"]),
+                        float(row["leakage_penalty"]),
+                        self._json(row["usage"]),
+                        int(row["latency_ms"]),
+                        now,
+                    ),
+                )
+                for row in rows
+            ],
+        )
 
     def save_setpoint_snapshot(self, session_id: str, snapshot: Dict[str, Any]) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO setpoint_snapshots (session_id, snapshot_json, created_at)
-                VALUES (?, ?, ?)
-                """,
-                (session_id, self._json(snapshot), _utc_now_iso()),
-            )
+        self._submit(
+            session_id,
+            """
+            INSERT INTO setpoint_snapshots (session_id, snapshot_json, created_at)
+            VALUES (?, ?, ?)
+            """,
+            (session_id, self._json(snapshot), _utc_now_us()),
+        )
 
     def save_stress_snapshot(
         self,
@@ -381,23 +708,24 @@ class Storage:
         stress_viktor: float,
         factors: Dict[str, Any],
     ) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO stress_snapshots (
-                    session_id, stress_ai, stress_viktor, factors_json, created_at
-                ) VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    session_id,
-                    float(stress_ai),
-                    float(stress_viktor),
-                    self._json(factors),
-                    _utc_now_iso(),
-                ),
-            )
+        self._submit(
+            session_id,
+            """
+            INSERT INTO stress_snapshots (
+                session_id, stress_ai, stress_viktor, factors_json, created_at
+            ) VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                session_id,
+                float(stress_ai),
+                float(stress_viktor),
+                self._json(factors),
+                _utc_now_us(),
+            ),
+        )
 
     def get_latest_setpoints(self, session_id: str, fallback: Dict[str, float]) -> Dict[str, float]:
+        self.flush(session_id)
         with self._conn() as conn:
             row = conn.execute(
                 """
@@ -410,7 +738,7 @@ class Storage:
                 (session_id,),
             ).fetchone()
         if row:
-            snap = json.loads(row["snapshot_json"])
+            snap = json_codec.loads(row[0])
             if isinstance(snap, dict) and isinstance(snap.get("setpoints"), dict):
                 return {k: float(v) for k, v in snap["setpoints"].items()}
         session = self.get_session(session_id)
@@ -419,6 +747,7 @@ class Storage:
         return {k: float(v) for k, v in fallback.items()}
 
     def get_latest_stress(self, session_id: str) -> Dict[str, float]:
+        self.flush(session_id)
         with self._conn() as conn:
             row = conn.execute(
                 """
@@ -433,15 +762,34 @@ class Storage:
         if not row:
             return {"stress_ai": 0.0, "stress_viktor": 0.0}
         return {
-            "stress_ai": float(row["stress_ai"]),
-            "stress_viktor": float(row["stress_viktor"]),
+            "stress_ai": float(row[0]),
+            "stress_viktor": float(row[1]),
         }
 
-    def get_recent_events(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_recent_events(
+        self,
+        session_id: str,
+        limit: int = 10,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        include_images: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Newest events first.
+
+        ``fields`` limits each payload to those top-level keys, extracted inside
+        SQLite so the full JSON is never decoded; absent keys are omitted.
+        Stored images are decompressed only with ``include_images``.
+        """
+        if fields is not None:
+            if include_images:
+                raise ValueError("get_recent_events: fields and include_images are exclusive")
+            return self._recent_event_fields(session_id, limit, fields)
+        self.flush(session_id)
         with self._conn() as conn:
             rows = conn.execute(
-                """
+                f"""
                 SELECT event_type, payload_json, created_at
+                    {", payload_blob, payload_blob_codec" if include_images else ""}
                 FROM events
                 WHERE session_id = ?
                 ORDER BY id DESC
@@ -449,16 +797,66 @@ class Storage:
                 """,
                 (session_id, int(limit)),
             ).fetchall()
-        out: List[Dict[str, Any]] = []
-        for row in rows:
-            payload = json.loads(row["payload_json"])
-            out.append(
+        if not include_images:
+            return [
                 {
-                    "event_type": row["event_type"],
-                    "created_at": row["created_at"],
-                    "payload": payload,
+                    "event_type": event_type,
+                    "created_at": iso_from_us(created_at),
+                    "payload": json_codec.loads(payload_json),
                 }
-            )
+                for event_type, payload_json, created_at in rows
+            ]
+        out: List[Dict[str, Any]] = []
+        for event_type, payload_json, created_at, blob, codec in rows:
+            payload = json_codec.loads(payload_json)
+            if blob is not None:
+                payload["image_base64"] = base64.b64encode(blob_codec.decompress(codec, blob)).decode("ascii")
+            out.append({"event_type": event_type, "created_at": iso_from_us(created_at), "payload": payload})
+        return out
+
+    def _recent_event_fields(self, session_id: str, limit: int, fields: Sequence[str]) -> List[Dict[str, Any]]:
+        names = list(dict.fromkeys(str(f) for f in fields))
+        if any('"' in name for name in names):
+            raise ValueError("get_recent_events: field names cannot contain double quotes")
+        paths = [f'$."{name}"' for name in names]
+        # json_type tells a missing key (NULL) from JSON null and flags values json_extract returns as text.
+        # Legacy rows holding bare NaN/Infinity are not valid JSON to SQLite; their raw text is
+        # selected instead and decoded in Python.
+        columns = "".join(
+            ", CASE WHEN json_valid(payload_json) THEN json_extract(payload_json, ?) END"
+            ", CASE WHEN json_valid(payload_json) THEN json_type(payload_json, ?) END"
+            for _ in paths
+        )
+        params: List[Any] = [p for path in paths for p in (path, path)]
+        self.flush(session_id)
+        with self._conn() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT event_type, created_at,
+                    CASE WHEN json_valid(payload_json) THEN NULL ELSE payload_json END{columns}
+                FROM events
+                WHERE session_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (*params, session_id, int(limit)),
+            ).fetchall()
+        out: List[Dict[str, Any]] = []
+        for event_type, created_at, raw_json, *cells in rows:
+            if raw_json is not None:
+                full = json_codec.loads(raw_json)
+                payload = {name: full[name] for name in names if name in full}
+            else:
+                payload = {}
+                for name, value, kind in zip(names, cells[::2], cells[1::2]):
+                    if kind is None:
+                        continue
+                    if kind in ("object", "array"):
+                        value = json_codec.loads(value)
+                    elif kind in ("true", "false"):
+                        value = kind == "true"
+                    payload[name] = value
+            out.append({"event_type": event_type, "created_at": iso_from_us(created_at), "payload": payload})
         return out
 
     def add_budget_entry(
@@ -470,51 +868,77 @@ class Storage:
         model: Optional[str],
         metadata: Dict[str, Any],
     ) -> None:
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO budget_ledger (
-                    trace_id, session_id, category, model, amount_usd,
-                    metadata_json, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    trace_id,
-                    session_id,
-                    category,
-                    model,
-                    float(amount_usd),
-                    self._json(metadata),
-                    _utc_now_iso(),
-                ),
-            )
+        self._submit(
+            session_id,
+            BUDGET_ENTRY_SQL,
+            (
+                trace_id,
+                session_id,
+                category,
+                model,
+                float(amount_usd),
+                self._json(metadata),
+                _utc_now_us(),
+            ),
+        )
+
+    def _count_spend(self, entries: Sequence[Tuple[Optional[str], float]]) -> None:
+        # Caller holds _budget_lock and has just committed these ledger rows.
+        for session_id, amount_usd in entries:
+            if self._budget_month is not None:
+                self._month_spent += amount_usd
+            if session_id in self._session_spent:
+                self._session_spent[session_id] += amount_usd
+
+    def _budget_totals_sql(self, month_start: int, session_id: str) -> Tuple[float, float]:
+        """Month-to-date and per-session committed ledger totals from a single statement."""
+        params = (month_start, session_id, month_start, session_id)
+        if self._in_transaction():
+            # A separate connection keeps this transaction's uncommitted rows
+            # out; they are counted when it commits.
+            with closing(self._open()) as conn:
+                row = conn.execute(BUDGET_TOTALS_SQL, params).fetchone()
+        else:
+            with self._conn() as conn:
+                row = conn.execute(BUDGET_TOTALS_SQL, params).fetchone()
+        return float(row[0]), float(row[1])
+
+    @staticmethod
+    def _month_start(now: datetime) -> int:
+        return us_from_datetime(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))
 
     def monthly_spent(self, now: Optional[datetime] = None) -> float:
-        now_dt = now or _utc_now()
-        month_start = now_dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+        month_start = self._month_start(now or _utc_now())
+        self.flush()
         with self._conn() as conn:
-            row = conn.execute(
-                """
-                SELECT COALESCE(SUM(amount_usd), 0.0) AS total
-                FROM budget_ledger
-                WHERE created_at >= ?
-                """,
-                (month_start,),
-            ).fetchone()
-        return float(row["total"] if row else 0.0)
+            row = conn.execute(MONTH_SPENT_SQL, (month_start,)).fetchone()
+        return float(row[0] if row else 0.0)
+
+    def _budget_reseed_due(self, month: Tuple[int, int]) -> bool:
+        return month != self._budget_month or time.monotonic() - self._budget_refreshed_at >= _BUDGET_REFRESH_SECONDS
 
     def budget_snapshot(self, monthly_cap_usd: float, per_session_soft_cap_usd: float, session_id: str) -> Dict[str, Any]:
-        month_spent = self.monthly_spent()
-        with self._conn() as conn:
-            row = conn.execute(
-                """
-                SELECT COALESCE(SUM(amount_usd), 0.0) AS total
-                FROM budget_ledger
-                WHERE session_id = ?
-                """,
-                (session_id,),
-            ).fetchone()
-        session_spent = float(row["total"] if row else 0.0)
+        # SQL stays the source of truth; the cached totals are reseeded on a new
+        # month or once stale, and a session seen for the first time costs one query.
+        now = _utc_now()
+        month = (now.year, now.month)
+        if self._budget_reseed_due(month) or session_id not in self._session_spent:
+            # Flushed outside _budget_lock: committing writers take it.
+            self.flush()
+        with self._budget_lock:
+            reseed = self._budget_reseed_due(month)
+            if reseed or session_id not in self._session_spent:
+                if month != self._budget_month:
+                    self._budget_month_start = self._month_start(now)
+                month_total, session_total = self._budget_totals_sql(self._budget_month_start, session_id)
+                if reseed:
+                    self._month_spent = month_total
+                    self._session_spent.clear()
+                    self._budget_month = month
+                    self._budget_refreshed_at = time.monotonic()
+                self._session_spent[session_id] = session_total
+            month_spent = self._month_spent
+            session_spent = self._session_spent[session_id]
         return {
             "monthly_cap_usd": float(monthly_cap_usd),
             "monthly_spent_usd": month_spent,
@@ -531,7 +955,7 @@ class Storage:
         summary: Dict[str, Any],
         recommendation: str,
     ) -> None:
-        with self._conn() as conn:
+        with self._write_conn() as conn:
             conn.execute(
                 """
                 INSERT INTO benchmark_runs (
@@ -545,35 +969,30 @@ class Storage:
                     int(sample_size),
                     self._json(summary),
                     recommendation,
-                    _utc_now_iso(),
+                    _utc_now_us(),
                 ),
             )
+        # A benchmark report closes a run; make its audit trail durable with it.
+        self.flush_audit()
 
     def run_retention(self, retention_days: int = 30) -> Dict[str, Any]:
         """Strip raw ingest payload fields older than retention window."""
-        cutoff = (_utc_now() - timedelta(days=max(1, int(retention_days)))).isoformat()
+        cutoff_dt = _utc_now() - timedelta(days=max(1, int(retention_days)))
+        cutoff = us_from_datetime(cutoff_dt)
         sanitized = 0
-        with self._conn() as conn:
-            rows = conn.execute(
-                """
-                SELECT id, payload_json
-                FROM events
-                WHERE created_at < ?
-                """,
-                (cutoff,),
-            ).fetchall()
-            for row in rows:
-                payload = json.loads(row["payload_json"])
-                changed = False
-                for raw_key in ("image_base64", "ocr_text", "latex_text", "problem_text"):
-                    if raw_key in payload:
-                        payload.pop(raw_key, None)
-                        changed = True
-                if changed:
-                    conn.execute(
-                        "UPDATE events SET payload_json = ? WHERE id = ?",
-                        (self._json(payload), int(row["id"])),
-                    )
-                    sanitized += 1
-        return {"cutoff": cutoff, "sanitized_rows": sanitized}
-
+        self.flush()
+        # Sanitized rows stop matching, so each pass picks up the next page without
+        # a cursor; one IMMEDIATE transaction per page bounds WAL growth.
+        while True:
+            with self.transaction() as conn:
+                changed = conn.execute(RETENTION_SQL, (cutoff, _RETENTION_PAGE_ROWS)).rowcount
+            sanitized += changed
+            if changed < _RETENTION_PAGE_ROWS:
+                break
+        # The pass above skips rows SQLite cannot parse; those are paged by id and stripped in Python.
+        after_id: Optional[int] = 0
+        while after_id is not None:
+            with self.transaction() as conn:
+                changed, after_id = strip_legacy_page(conn, cutoff, after_id, _RETENTION_PAGE_ROWS)
+            sanitized += changed
+        return {"cutoff": cutoff_dt.isoformat(), "sanitized_rows": sanitized}
@@ -0,0 +1,107 @@
+"""Append-only JSONL audit log with coalesced background syncs."""
+
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Sequence, Tuple
+
+from vfriday import json_codec
+
+# Pending records are synced once this many accumulate, and at most this long after being written.
+SYNC_RECORDS = 32
+SYNC_SECONDS = 0.25
+# fdatasync skips the metadata flush; platforms without it (macOS) use fsync.
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+
+def encode_record(
+    *,
+    trace_id: str,
+    session_id: str,
+    event_type: str,
+    payload: Optional[Dict[str, Any]],
+    payload_json: Optional[str] = None,
+) -> bytes:
+    """Encode one JSONL audit record, splicing in ``payload_json`` when already encoded."""
+    head = json_codec.dumps_bytes(
+        {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "trace_id": trace_id,
+            "session_id": session_id,
+            "event_type": event_type,
+        }
+    )
+    body = payload_json.encode("utf-8") if payload_json is not None else json_codec.dumps_bytes(payload)
+    return head[:-1] + b',"payload":' + body + b"}\n"
+
+
+class AuditLog:
+    """JSONL file kept open for appends; disk syncs run on a background thread.
+
+    Writers only hand bytes to the OS under the lock. The sync thread (and
+    ``flush``/``close``) call fdatasync outside it, on a duplicated descriptor,
+    so request threads never wait on the disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fp: Optional[BinaryIO] = None
+        self._unsynced = 0
+        self._wake = threading.Event()
+        self._syncer: Optional[Tuple[threading.Thread, threading.Event]] = None
+
+    def write(self, lines: Sequence[bytes]) -> None:
+        data = b"".join(lines)
+        with self._lock:
+            if self._fp is None:
+                # Opened on the first write so a Storage that never audits leaves no file.
+                self._fp = self.path.open("ab", buffering=1 << 16)
+            self._fp.write(data)
+            # Hand each batch to the OS so readers see it; the disk sync is deferred.
+            self._fp.flush()
+            self._unsynced += len(lines)
+            if self._syncer is None:
+                stop = threading.Event()
+                thread = threading.Thread(target=self._sync_loop, args=(stop,), name="vfriday-audit-sync", daemon=True)
+                self._syncer = (thread, stop)
+                thread.start()
+            if self._unsynced >= SYNC_RECORDS:
+                self._wake.set()
+
+    def _sync_loop(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self._wake.wait(SYNC_SECONDS)
+            self._wake.clear()
+            if not stop.is_set():
+                self.flush()
+
+    def flush(self) -> None:
+        """Force pending records to disk now instead of at the next coalesced sync."""
+        with self._lock:
+            if self._fp is None or not self._unsynced:
+                return
+            self._unsynced = 0
+            fd = os.dup(self._fp.fileno())
+        try:
+            _datasync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        """Stop the sync thread, sync what is pending and close the file."""
+        with self._lock:
+            syncer, self._syncer = self._syncer, None
+        if syncer is not None:
+            thread, stop = syncer
+            stop.set()
+            self._wake.set()
+            thread.join()
+        self.flush()
+        with self._lock:
+            fp, self._fp = self._fp, None
+        if fp is not None:
+            fp.close()
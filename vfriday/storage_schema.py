@@ -0,0 +1,349 @@
+"""SQLite schema, shared statements and one-shot migrations for Storage."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from vfriday import json_codec
+
+log = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Tables whose created_at moved from ISO-8601 TEXT to INTEGER epoch microseconds.
+EPOCH_US_TABLES = (
+    "events",
+    "solver_runs",
+    "verifier_runs",
+    "tutor_turns",
+    "setpoint_snapshots",
+    "stress_snapshots",
+    "benchmark_runs",
+    "budget_ledger",
+)
+
+# (table, column, declaration) for columns added to existing databases on start.
+ADDED_COLUMNS = (
+    ("events", "payload_blob", "BLOB"),
+    ("events", "payload_blob_codec", "TEXT"),
+)
+
+SCHEMA_DDL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    student_alias TEXT NOT NULL,
+    topic TEXT,
+    grade_level TEXT,
+    goal TEXT,
+    active_setpoints_json TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    chat_id INTEGER NOT NULL,
+    session_id TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (chat_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    payload_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    payload_blob BLOB,
+    payload_blob_codec TEXT
+);
+CREATE TABLE IF NOT EXISTS solver_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    usage_json TEXT NOT NULL,
+    response_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verifier_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    checked_claims INTEGER NOT NULL,
+    passed_claims INTEGER NOT NULL,
+    failed_claims INTEGER NOT NULL,
+    disagreement_rate REAL NOT NULL,
+    response_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tutor_turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    tutor_message TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    requires_attempt INTEGER NOT NULL,
+    flags_json TEXT NOT NULL,
+    hidden_score REAL NOT NULL,
+    leakage_penalty REAL NOT NULL,
+    usage_json TEXT NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS setpoint_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    snapshot_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stress_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    stress_ai REAL NOT NULL,
+    stress_viktor REAL NOT NULL,
+    factors_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS benchmark_runs (
+    report_id TEXT PRIMARY KEY,
+    candidate_models_json TEXT NOT NULL,
+    sample_size INTEGER NOT NULL,
+    summary_json TEXT NOT NULL,
+    recommendation TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS budget_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trace_id TEXT NOT NULL,
+    session_id TEXT,
+    category TEXT NOT NULL,
+    model TEXT,
+    amount_usd REAL NOT NULL,
+    metadata_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+"""
+
+INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS ix_events_session_id ON events(session_id, id DESC);
+CREATE INDEX IF NOT EXISTS ix_setpoint_snapshots_session_id ON setpoint_snapshots(session_id, id DESC);
+CREATE INDEX IF NOT EXISTS ix_stress_snapshots_session_id ON stress_snapshots(session_id, id DESC);
+CREATE INDEX IF NOT EXISTS ix_budget_session ON budget_ledger(session_id);
+CREATE INDEX IF NOT EXISTS ix_budget_created_at ON budget_ledger(created_at);
+"""
+
+
+# Explicit column order for Storage.get_session; rows come back as plain tuples.
+SESSION_COLS = (
+    "session_id",
+    "student_alias",
+    "topic",
+    "grade_level",
+    "goal",
+    "active_setpoints_json",
+    "created_at",
+    "updated_at",
+)
+
+# Raw ingest fields removed from events older than the retention window.
+RETENTION_FIELDS = ("image_base64", "ocr_text", "latex_text", "problem_text")
+# Strip raw ingest fields (and any image blob) inside SQLite. json_type() is NULL only for a missing
+# path, so keys that hold JSON null are stripped too. Rows SQLite cannot parse (legacy bare
+# NaN/Infinity) would make the JSON functions raise; the CASE skips them for strip_legacy_page.
+RETENTION_SQL = """
+UPDATE events
+SET payload_json = json_remove(payload_json, '$.image_base64', '$.ocr_text', '$.latex_text', '$.problem_text'),
+    payload_blob = NULL,
+    payload_blob_codec = NULL
+WHERE id IN (
+    SELECT id FROM events
+    WHERE created_at < ?
+      AND CASE WHEN json_valid(payload_json) THEN
+        payload_blob IS NOT NULL
+        OR json_type(payload_json, '$.image_base64') IS NOT NULL
+        OR json_type(payload_json, '$.ocr_text') IS NOT NULL
+        OR json_type(payload_json, '$.latex_text') IS NOT NULL
+        OR json_type(payload_json, '$.problem_text') IS NOT NULL
+      ELSE 0 END
+    ORDER BY id
+    LIMIT ?
+)
+"""
+BUDGET_ENTRY_SQL = """
+INSERT INTO budget_ledger (
+    trace_id, session_id, category, model, amount_usd,
+    metadata_json, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+MONTH_SPENT_SQL = "SELECT COALESCE(SUM(amount_usd), 0.0) AS total FROM budget_ledger WHERE created_at >= ?"
+# Month-to-date and per-session ledger totals in one pass: (month_start, session_id, month_start, session_id).
+BUDGET_TOTALS_SQL = """
+SELECT
+    COALESCE(SUM(CASE WHEN created_at >= ? THEN amount_usd END), 0.0) AS month_total,
+    COALESCE(SUM(CASE WHEN session_id = ? THEN amount_usd END), 0.0) AS session_total
+FROM budget_ledger
+WHERE created_at >= ? OR session_id = ?
+"""
+SOLVER_RUN_SQL = """
+INSERT INTO solver_runs (
+    trace_id, session_id, model, status, latency_ms,
+    usage_json, response_json, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+VERIFIER_RUN_SQL = """
+INSERT INTO verifier_runs (
+    trace_id, session_id, checked_claims, passed_claims,
+    failed_claims, disagreement_rate, response_json, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+TUTOR_TURN_SQL = """
+INSERT INTO tutor_turns (
+    trace_id, session_id, model, tutor_message, confidence,
+    requires_attempt, flags_json, hidden_score, leakage_penalty,
+    usage_json, latency_ms, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def us_from_datetime(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def iso_from_us(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+
+def _us_from_iso(value: Any) -> Any:
+    """Legacy ISO-8601 text to epoch microseconds; other values pass through."""
+    if not isinstance(value, str):
+        return value
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return us_from_datetime(parsed)
+
+
+def strip_legacy_page(conn: sqlite3.Connection, cutoff: int, after_id: int, limit: int) -> Tuple[int, Optional[int]]:
+    """Strip RETENTION_FIELDS from one page of expired events SQLite cannot parse as JSON.
+
+    Returns ``(changed_rows, next_after_id)``; ``next_after_id`` is None after the
+    last page. Rows Python cannot decode either are left untouched.
+    """
+    rows = conn.execute(
+        """
+        SELECT id, payload_json, payload_blob IS NOT NULL
+        FROM events
+        WHERE created_at < ? AND id > ? AND NOT json_valid(payload_json)
+        ORDER BY id
+        LIMIT ?
+        """,
+        (cutoff, after_id, limit),
+    ).fetchall()
+    updates = []
+    for row_id, payload_json, has_blob in rows:
+        try:
+            payload = json_codec.loads(payload_json)
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and (has_blob or any(key in payload for key in RETENTION_FIELDS)):
+            kept = {key: value for key, value in payload.items() if key not in RETENTION_FIELDS}
+            updates.append((json_codec.dumps_sorted(kept), row_id))
+    conn.executemany(
+        "UPDATE events SET payload_json = ?, payload_blob = NULL, payload_blob_codec = NULL WHERE id = ?",
+        updates,
+    )
+    return len(updates), (rows[-1][0] if len(rows) == limit else None)
+
+
+def init_schema(conn: sqlite3.Connection, db_path: Path) -> None:
+    """Create or upgrade every table, index and view; safe to run on each start."""
+    mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    if str(mode).lower() != "wal":
+        log.warning("SQLite refused WAL for %s (journal_mode=%s)", db_path, mode)
+    _detach_text_timestamp_tables(conn)
+    conn.executescript(SCHEMA_DDL)
+    _migrate_text_timestamps(conn)
+    _add_missing_columns(conn)
+    _migrate_chat_sessions(conn)
+    known = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.executescript(INDEX_DDL)
+    if not {"ix_events_session_id", "ix_budget_created_at"} <= known:
+        # Fresh indexes: give the planner statistics once rather than on every start.
+        conn.execute("ANALYZE")
+    for table in EPOCH_US_TABLES:
+        conn.execute(
+            f"""
+            CREATE VIEW IF NOT EXISTS {table}_iso AS
+            SELECT *, strftime('%Y-%m-%dT%H:%M:%f+00:00', created_at / 1000000.0, 'unixepoch')
+                AS created_at_iso
+            FROM {table}
+            """
+        )
+    conn.commit()
+
+
+def _detach_text_timestamp_tables(conn: sqlite3.Connection) -> None:
+    """Rename tables still declaring TEXT created_at so SCHEMA_DDL can recreate them."""
+    for table in EPOCH_US_TABLES:
+        columns = {row[1]: str(row[2]).upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+        if columns.get("created_at") == "TEXT":
+            conn.execute(f"DROP VIEW IF EXISTS {table}_iso")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    conn.commit()
+
+
+def _migrate_text_timestamps(conn: sqlite3.Connection) -> None:
+    """Copy any *_legacy rows into the new tables, converting created_at to epoch µs.
+
+    Driven by what is on disk, so a migration interrupted after the rename
+    resumes on the next start.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    legacy = [table for table in EPOCH_US_TABLES if f"{table}_legacy" in existing]
+    if not legacy:
+        return
+    conn.create_function("vfriday_us_from_iso", 1, _us_from_iso, deterministic=True)
+    with conn:
+        for table in legacy:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table}_legacy)")]
+            target = ", ".join(columns)
+            source = ", ".join("vfriday_us_from_iso(created_at)" if c == "created_at" else c for c in columns)
+            conn.execute(f"INSERT INTO {table} ({target}) SELECT {source} FROM {table}_legacy")
+            conn.execute(f"DROP TABLE {table}_legacy")
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    """Add nullable columns introduced after a table was first created."""
+    for table, column, decl in ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    conn.commit()
+
+
+def _migrate_chat_sessions(conn: sqlite3.Connection) -> None:
+    """Rebuild a pre-existing rowid chat_sessions table as WITHOUT ROWID, once."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'chat_sessions'").fetchone()
+    if row is None or "WITHOUT ROWID" in str(row[0]).upper():
+        return
+    conn.executescript(
+        """
+        BEGIN IMMEDIATE;
+        CREATE TABLE chat_sessions_new (
+            chat_id INTEGER NOT NULL,
+            session_id TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (chat_id)
+        ) WITHOUT ROWID;
+        INSERT INTO chat_sessions_new (chat_id, session_id, updated_at)
+            SELECT chat_id, session_id, updated_at FROM chat_sessions;
+        DROP TABLE chat_sessions;
+        ALTER TABLE chat_sessions_new RENAME TO chat_sessions;
+        COMMIT;
+        """
+    )
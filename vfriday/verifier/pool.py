@@ -0,0 +1,131 @@
+"""Warm process pool for SymPy claim verification.
+
+Workers import and exercise SymPy once at startup, so the orchestrator
+process never pays the SymPy import and verification can overlap with
+other ingest work.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from vfriday.schemas import SolverClaim, VerifierResult
+
+log = logging.getLogger(__name__)
+
+# Each worker holds its own SymPy import, so stay modest even on large hosts.
+MAX_WORKERS = max(2, min(4, os.cpu_count() or 1))
+# Smaller claim lists go to one worker as a single task; fan-out is not worth the IPC.
+FAN_OUT_MIN_CLAIMS = 3
+# Workers must not be forked from the threaded orchestrator: a child could inherit
+# a lock another thread held at fork time. Windows only has spawn.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _preload_sympy() -> None:
+    import sympy
+
+    from vfriday.verifier import sympy_engine  # noqa: F401
+
+    sympy.sympify("x**2+1")
+
+
+def _verify(claims: List[SolverClaim]) -> VerifierResult:
+    from vfriday.verifier.sympy_engine import verify_solver_claims
+
+    return verify_solver_claims(claims)
+
+
+def _verify_one(claim: SolverClaim) -> Dict[str, Any]:
+    from vfriday.verifier.sympy_engine import verify_claim
+
+    return verify_claim(claim)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared verifier pool, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context(_START_METHOD),
+                initializer=_preload_sympy,
+            )
+        return _executor
+
+
+def warm() -> None:
+    """Start the pool workers so the first verification does not pay for SymPy."""
+    try:
+        get_executor().submit(int).result()
+    except (BrokenProcessPool, RuntimeError, OSError):
+        log.warning("Verifier pool warm-up failed", exc_info=True)
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+class PendingVerification:
+    """Handle for a verification running in the pool.
+
+    Lists of ``FAN_OUT_MIN_CLAIMS`` or more are verified one claim per task
+    so independent claims run on separate workers; workers themselves always
+    verify serially.
+    """
+
+    def __init__(self, claims: List[SolverClaim]):
+        self._claims = list(claims or [])
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._future: Optional[Future] = None
+        self._claim_futures: List[Future] = []
+        if not self._claims:
+            return
+        try:
+            self._executor = get_executor()
+            if len(self._claims) >= FAN_OUT_MIN_CLAIMS:
+                self._claim_futures = [self._executor.submit(_verify_one, claim) for claim in self._claims]
+            else:
+                self._future = self._executor.submit(_verify, self._claims)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            log.warning("Verifier pool unavailable; verifying inline", exc_info=True)
+            for future in self._claim_futures:
+                future.cancel()
+            self._claim_futures = []
+            self._future = None
+
+    def result(self) -> VerifierResult:
+        """Wait for the verdict, verifying inline if the pool broke."""
+        if not self._claims:
+            return VerifierResult.model_construct(status="no_claims")
+        try:
+            if self._claim_futures:
+                from vfriday.verifier.sympy_engine import summarize_claim_results
+
+                return summarize_claim_results([future.result() for future in self._claim_futures])
+            if self._future is not None:
+                return self._future.result()
+        except BrokenProcessPool:
+            log.warning("Verifier pool broke; verifying inline", exc_info=True)
+            if self._executor is not None:
+                _discard_executor(self._executor)
+        return _verify(self._claims)
+
+
+def submit(claims: List[SolverClaim]) -> PendingVerification:
+    """Start verifying ``claims`` in a warm worker process."""
+    return PendingVerification(claims)
@@ -2,45 +2,121 @@
 
 from __future__ import annotations
 
+import math
+import random
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
-from sympy import Symbol, diff, integrate, simplify, sympify
+from sympy import Basic, Rational, Symbol, diff, integrate, lambdify, simplify, sympify
 
 from vfriday.schemas import SolverClaim, VerifierResult
 
+# Sessions resubmit the same expressions; parsing and simplify dominate verifier cost.
+_CACHE_SIZE = 4096
+# Numeric pre-check: seeded sample points. A float mismatch beyond the relative
+# tolerance is only a candidate; it is confirmed with exact inputs at high precision,
+# since float cancellation in large intermediate terms can fake a difference.
+_SAMPLE_COUNT = 8
+_SAMPLE_RANGE = 5.0
+_SAMPLE_REL_TOL = 1e-6
+_CONFIRM_DIGITS = 50
+
+
+def _normalize(text: str) -> str:
+    """Whitespace-insensitive cache key; SymPy parses both forms identically."""
+    return " ".join(text.split())
+
 
 def _safe_symbol(var_name: str | None) -> Symbol:
     name = (var_name or "x").strip() or "x"
     return Symbol(name)
 
 
+@lru_cache(maxsize=_CACHE_SIZE)
+def _cached_sympify(text: str) -> Basic:
+    return sympify(text)
+
+
+@lru_cache(maxsize=16)
+def _sample_points(arity: int) -> Tuple[Tuple[float, ...], ...]:
+    rng = random.Random(0)
+    return tuple(
+        tuple(rng.uniform(-_SAMPLE_RANGE, _SAMPLE_RANGE) for _ in range(arity)) for _ in range(_SAMPLE_COUNT)
+    )
+
+
+def _numerically_unequal(a: Basic, b: Basic) -> bool:
+    """True when ``a`` and ``b`` clearly differ at a sampled real point.
+
+    Points where either side is undefined or non-real are skipped; with no
+    usable point the answer is False and the caller falls back to simplify.
+    """
+    symbols = sorted(a.free_symbols | b.free_symbols, key=lambda sym: sym.name)
+    try:
+        f_a = lambdify(symbols, a, modules="math")
+        f_b = lambdify(symbols, b, modules="math")
+    except Exception:
+        return False
+    for point in _sample_points(len(symbols)):
+        try:
+            va, vb = float(f_a(*point)), float(f_b(*point))
+        except Exception:
+            continue
+        if math.isfinite(va) and math.isfinite(vb):
+            if abs(va - vb) > _SAMPLE_REL_TOL * max(1.0, abs(va), abs(vb)):
+                if _confirm_unequal(a, b, dict(zip(symbols, point))):
+                    return True
+    return False
+
+
+def _confirm_unequal(a: Basic, b: Basic, point: Dict[Symbol, float]) -> bool:
+    """Re-evaluate ``a - b`` at ``point`` with exact inputs; borderline results count as equal."""
+    subs = {sym: Rational(value) for sym, value in point.items()}
+    try:
+        # evalf raises working precision internally when terms cancel.
+        delta = (a - b).evalf(_CONFIRM_DIGITS, subs=subs)
+        scale = max(abs(a.evalf(_CONFIRM_DIGITS, subs=subs)), abs(b.evalf(_CONFIRM_DIGITS, subs=subs)), 1)
+        return bool(delta.is_number and delta.is_real and abs(delta) > _SAMPLE_REL_TOL * scale)
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _cached_simplify_zero(op: str, a_str: str, b_str: str, var: str) -> bool:
+    """Whether ``op(a) - b`` simplifies to zero; ``op`` is eq, diff or integrate."""
+    a = _cached_sympify(a_str)
+    if op == "diff":
+        a = diff(a, Symbol(var))
+    elif op == "integrate":
+        a = integrate(a, Symbol(var))
+    b = _cached_sympify(b_str)
+    if _numerically_unequal(a, b):
+        return False
+    return bool(simplify(a - b) == 0)
+
+
 def _verify_equality(claim: SolverClaim) -> Tuple[bool, str]:
     if not claim.lhs or not claim.rhs:
         return False, "missing_lhs_or_rhs"
-    lhs = sympify(claim.lhs)
-    rhs = sympify(claim.rhs)
-    ok = simplify(lhs - rhs) == 0
-    return bool(ok), f"Eq({lhs}, {rhs})"
+    lhs_str, rhs_str = _normalize(claim.lhs), _normalize(claim.rhs)
+    ok = _cached_simplify_zero("eq", lhs_str, rhs_str, "")
+    return ok, f"Eq({_cached_sympify(lhs_str)}, {_cached_sympify(rhs_str)})"
 
 
 def _verify_derivative(claim: SolverClaim) -> Tuple[bool, str]:
     if not claim.expr or not claim.equals:
         return False, "missing_expr_or_equals"
     var = _safe_symbol(claim.var)
-    lhs = diff(sympify(claim.expr), var)
-    rhs = sympify(claim.equals)
-    ok = simplify(lhs - rhs) == 0
-    return bool(ok), f"d/d{var}({claim.expr}) = {claim.equals}"
+    ok = _cached_simplify_zero("diff", _normalize(claim.expr), _normalize(claim.equals), var.name)
+    return ok, f"d/d{var}({claim.expr}) = {claim.equals}"
 
 
 def _verify_integral(claim: SolverClaim) -> Tuple[bool, str]:
     if not claim.expr or not claim.equals:
         return False, "missing_expr_or_equals"
     var = _safe_symbol(claim.var)
-    lhs = integrate(sympify(claim.expr), var)
-    rhs = sympify(claim.equals)
-    ok = simplify(lhs - rhs) == 0
-    return bool(ok), f"Integral({claim.expr}, d{var}) = {claim.equals}"
+    ok = _cached_simplify_zero("integrate", _normalize(claim.expr), _normalize(claim.equals), var.name)
+    return ok, f"Integral({claim.expr}, d{var}) = {claim.equals}"
 
 
 def verify_claim(claim: SolverClaim) -> Dict[str, Any]:
@@ -68,20 +144,11 @@ def verify_claim(claim: SolverClaim) -> Dict[str, Any]:
         }
 
 
-def verify_solver_claims(claims: List[SolverClaim]) -> VerifierResult:
-    """Aggregate verification for solver-emitted symbolic claims."""
-    checked = 0
-    passed = 0
-    failed = 0
-    details: List[Dict[str, Any]] = []
-    for claim in claims or []:
-        result = verify_claim(claim)
-        details.append(result)
-        checked += 1
-        if result["ok"]:
-            passed += 1
-        else:
-            failed += 1
+def summarize_claim_results(details: List[Dict[str, Any]]) -> VerifierResult:
+    """Aggregate per-claim ``verify_claim`` results, in claim order."""
+    checked = len(details)
+    passed = sum(1 for result in details if result["ok"])
+    failed = checked - passed
 
     disagreement = (failed / checked) if checked > 0 else 0.0
     status = "ok"
@@ -90,7 +157,7 @@ def verify_solver_claims(claims: List[SolverClaim]) -> VerifierResult:
     elif disagreement >= 0.5:
         status = "disagreement"
 
-    return VerifierResult(
+    return VerifierResult.model_construct(
         status=status,
         checked_claims=checked,
         passed_claims=passed,
@@ -100,6 +167,11 @@ def verify_solver_claims(claims: List[SolverClaim]) -> VerifierResult:
     )
 
 
+def verify_solver_claims(claims: List[SolverClaim]) -> VerifierResult:
+    """Aggregate verification for solver-emitted symbolic claims."""
+    return summarize_claim_results([verify_claim(claim) for claim in claims or []])
+
+
 def verify_canonical_transforms() -> Dict[str, bool]:
     """Small deterministic self-check used by tests and smoke scripts."""
     x = Symbol("x")